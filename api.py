@@ -1,4 +1,6 @@
+import asyncio
 import tempfile
+import hashlib
 import os
 import uuid
 
@@ -15,10 +17,38 @@ from fastapi.responses import (
 )
 
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from bulk_upload.services.employee_processor import process_excel
-from bulk_upload.db import create_job_entry
-from bulk_upload.config import DB_CRED
+from bulk_upload.services.jobs import (
+    queue_run_job,
+    submit_job,
+    get_job,
+    retain_upload,
+    find_upload
+)
+from bulk_upload.services.reference_data import reference_cache
+from bulk_upload.services.readers import (
+    UPLOAD_EXTENSIONS,
+    detect_format,
+    read_upload,
+    count_upload_rows
+)
+from bulk_upload.db import (
+    create_job_entry,
+    fetch_job_status,
+    get_pool_stats
+)
+from bulk_upload.config import (
+    DB_CRED,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_MAX_BYTES,
+    EXCEL_STREAMING_MIN_BYTES
+)
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# 'insert' rejects employees already in DB, 'sync' writes only what changed for them
+UPLOAD_MODES = ('insert', 'sync')
 
 app = FastAPI(title="Employee Upload API")
 
@@ -31,24 +61,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def _spool_upload(file: UploadFile, suffix: str) -> tuple[str, int, str]:
+    """Stream an upload to a temp file in `UPLOAD_CHUNK_SIZE` chunks.
+    Rejects it with 413 as soon as it grows past `UPLOAD_MAX_BYTES`.
+    Returns (temp_path, size_in_bytes, sha256_hexdigest)."""
+
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {UPLOAD_MAX_BYTES} bytes upload limit")
+
+    sha256 = hashlib.sha256()
+    size = 0
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        temp_path = tmp.name
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"File exceeds the {UPLOAD_MAX_BYTES} bytes upload limit")
+                sha256.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.remove(temp_path)
+            raise
+
+    return temp_path, size, sha256.hexdigest()
+
+
+async def _read_spooled_upload(temp_path: str, extension: str, file_size: int, file_format: str) -> tuple:
+    """Large .xlsx files are streamed in chunks, everything else is parsed once here
+    and handed to process_excel.
+    Returns (df or None when streamed, stream, total_records), streamed files only give an
+    estimate of total_records that the job corrects when it completes."""
+
+    stream = extension == ".xlsx" and file_size > EXCEL_STREAMING_MIN_BYTES
+    if stream:
+        return None, stream, await run_in_threadpool(count_upload_rows, temp_path, file_format)
+
+    df = await run_in_threadpool(read_upload, temp_path, file_format)
+    return df, stream, df.height
+
+
 @app.post("/upload-employees")
-async def upload_employees(file: UploadFile = File(...)):
+async def upload_employees(
+    file: UploadFile = File(...),
+    background: bool = False,
+    mode: str = 'insert'
+):
 
     job_id = str(uuid.uuid4())
 
-    if not file.filename.endswith((".xlsx", ".xls")):
-        raise HTTPException(status_code=400, detail="Only Excel files allowed")
+    if mode not in UPLOAD_MODES:
+        raise HTTPException(status_code=400, detail=f"`mode` must be one of {', '.join(UPLOAD_MODES)}")
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        tmp.write(await file.read())
-        temp_path = tmp.name
+    extension = os.path.splitext(file.filename)[1].lower()
+    if extension not in UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Only {', '.join(sorted(UPLOAD_EXTENSIONS))} files allowed")
+
+    temp_path, file_size, file_sha256 = await _spool_upload(file, extension)
+    print(f"[Check] : Received `{file.filename}` ({file_size} bytes, sha256 {file_sha256})")
+
+    # Kept next to the job files so a failed job can be resumed
+    temp_path = retain_upload(temp_path, job_id, extension)
+
+    # The background job takes ownership of the uploaded file, a failed run keeps it for a resume
+    keep_upload = False
 
     try:
-        import polars as pl
-        df = pl.read_excel(temp_path)
-        total_records = df.height
+        file_format = detect_format(temp_path, file.filename)
+        df, stream, total_records = await _read_spooled_upload(temp_path, extension, file_size, file_format)
         print(f"[Check] : Total Records found for insertion : {total_records}")
-        del df
 
         try:
             create_job_entry(
@@ -61,31 +144,221 @@ async def upload_employees(file: UploadFile = File(...)):
         except Exception as e:
             print(f"[JobIdEntryError] : ❌ Failed to create job_id `{job_id}` entry in DB due to `{e}`")
 
-        success, failed_df = process_excel(
-            file_path=temp_path,
-            job_id=job_id
+        if background:
+            submit_job(temp_path, job_id, file.filename, df, stream, file_format, mode=mode)
+            keep_upload = True
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "message": "Upload accepted for processing",
+                    "job_id": job_id,
+                    "file_sha256": file_sha256,
+                    "status_url": f"/jobs/{job_id}"
+                }
+            )
+
+        keep_upload = True
+        failed_file = await asyncio.wrap_future(
+            queue_run_job(temp_path, job_id, df, stream, file_format, mode=mode)
         )
+        keep_upload = False
 
-        if success:
+        if failed_file is None:
             return JSONResponse(
                 status_code=200,
                 content={
                     "message": "All records inserted successfully",
-                    "job_id": job_id
+                    "job_id": job_id,
+                    "file_sha256": file_sha256
                 }
             )
 
-        failed_file = temp_path.replace(".xlsx", "_failed.xlsx")
-        failed_df.to_pandas().to_excel(failed_file, index=False)
+        return FileResponse(
+            path=failed_file,
+            filename="failed_records.xlsx",
+            media_type=XLSX_MEDIA_TYPE
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    finally:
+        if not keep_upload:
+            os.remove(temp_path)
+
+
+@app.post("/validate-employees")
+async def validate_employees(
+    file: UploadFile = File(...),
+    mode: str = 'insert'
+):
+
+    """Dry run of /upload-employees: every check runs, nothing is written and no job row is created.
+    Returns the same failed-records workbook, or 200 when every record would be inserted."""
+
+    validation_id = f"dryrun-{uuid.uuid4()}"
+
+    if mode not in UPLOAD_MODES:
+        raise HTTPException(status_code=400, detail=f"`mode` must be one of {', '.join(UPLOAD_MODES)}")
+
+    extension = os.path.splitext(file.filename)[1].lower()
+    if extension not in UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Only {', '.join(sorted(UPLOAD_EXTENSIONS))} files allowed")
+
+    temp_path, file_size, file_sha256 = await _spool_upload(file, extension)
+    print(f"[Check] : Received `{file.filename}` for validation ({file_size} bytes, sha256 {file_sha256})")
+
+    try:
+        file_format = detect_format(temp_path, file.filename)
+        df, stream, total_records = await _read_spooled_upload(temp_path, extension, file_size, file_format)
+        print(f"[Check] : Total Records found for validation : {total_records}")
+
+        failed_file = await asyncio.wrap_future(
+            queue_run_job(temp_path, validation_id, df, stream, file_format, True, mode=mode)
+        )
+
+        if failed_file is None:
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "message": "All records passed validation",
+                    "total_record": total_records,
+                    "file_sha256": file_sha256
+                }
+            )
 
         return FileResponse(
             path=failed_file,
             filename="failed_records.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            media_type=XLSX_MEDIA_TYPE
         )
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     finally:
-        os.remove(temp_path)
\ No newline at end of file
+        os.remove(temp_path)
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+
+    job = get_job(job_id)
+
+    try:
+        db_job = fetch_job_status(job_id, *DB_CRED)
+    except Exception as e:
+        print(f"[JobStatusError] : ❌ Failed to fetch job `{job_id}` from DB due to `{e}`")
+        db_job = None
+
+    if job is None and db_job is None:
+        raise HTTPException(status_code=404, detail=f"Job `{job_id}` not found")
+
+    db_job = db_job or {}
+    job = job or {}
+
+    total = db_job.get("total_record")
+    completed = db_job.get("records_completed")
+
+    return JSONResponse(
+        status_code=200,
+        content={
+            "job_id": job_id,
+            "status": job.get("status") or db_job.get("status"),
+            "total_record": total,
+            "records_completed": completed,
+            # a streamed upload's total is estimated until the job completes
+            "progress": min(round(100 * completed / total, 2), 100.0) if total and completed is not None else None,
+            "failed_records_ready": bool(job.get("failed_file")),
+            "error": job.get("error")
+        }
+    )
+
+
+@app.post("/jobs/{job_id}/resume")
+def resume_upload(job_id: str, mode: str = 'insert'):
+
+    if mode not in UPLOAD_MODES:
+        raise HTTPException(status_code=400, detail=f"`mode` must be one of {', '.join(UPLOAD_MODES)}")
+
+    job = get_job(job_id)
+    if job is not None and job["status"] in ("PENDING", "PROCESSING"):
+        raise HTTPException(status_code=409, detail=f"Job `{job_id}` is still {job['status']}")
+
+    try:
+        db_job = fetch_job_status(job_id, *DB_CRED)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to fetch job `{job_id}` from DB due to `{e}`")
+
+    if db_job is None:
+        raise HTTPException(status_code=404, detail=f"Job `{job_id}` not found")
+
+    if db_job["status"] == "COMPLETED":
+        raise HTTPException(status_code=409, detail=f"Job `{job_id}` already completed")
+
+    file_path = find_upload(job_id)
+    if file_path is None:
+        raise HTTPException(status_code=410, detail=f"Upload of job `{job_id}` is no longer retained")
+
+    stream = file_path.endswith(".xlsx") and os.path.getsize(file_path) > EXCEL_STREAMING_MIN_BYTES
+    submit_job(file_path, job_id, db_job["uploaded_file_name"], stream=stream, resume=True, mode=mode)
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "message": "Job resumed, already committed records are skipped",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}"
+        }
+    )
+
+
+@app.get("/jobs/{job_id}/failed-records")
+def download_failed_records(job_id: str):
+
+    job = get_job(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job `{job_id}` not found")
+
+    if job["status"] not in ("COMPLETED", "FAILED"):
+        raise HTTPException(status_code=409, detail=f"Job `{job_id}` is still {job['status']}")
+
+    if not job.get("failed_file"):
+        raise HTTPException(status_code=404, detail=f"Job `{job_id}` has no failed records")
+
+    return FileResponse(
+        path=job["failed_file"],
+        filename="failed_records.xlsx",
+        media_type=XLSX_MEDIA_TYPE
+    )
+
+
+@app.get("/db-pool-stats")
+def db_pool_stats():
+    return JSONResponse(
+        status_code=200,
+        content={"pools": get_pool_stats()}
+    )
+
+
+@app.get("/reference-cache/stats")
+def reference_cache_stats():
+    return JSONResponse(
+        status_code=200,
+        content=reference_cache.stats()
+    )
+
+
+@app.post("/reference-cache/invalidate")
+def invalidate_reference_cache(table: str | None = None):
+
+    try:
+        dropped = reference_cache.invalidate(table)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return JSONResponse(
+        status_code=200,
+        content={"invalidated": dropped}
+    )
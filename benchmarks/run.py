@@ -0,0 +1,178 @@
+"""
+Throughput benchmark of `process_excel` against a local stand-in database.
+
+Point DB_HOST / DB_USER / DB_PASSWORD / DATABASE / DB_PORT at a scratch MySQL
+holding the master tables and at least one employee. Every real run inserts
+its synthetic employees there.
+
+    python -m bulk_upload.benchmarks.run --rows 1000 10000 --error-rate 0.02
+    python -m bulk_upload.benchmarks.run --rows 1000000 --format parquet --engine staging
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import uuid
+
+import polars as pl
+import psutil
+
+from bulk_upload.config import (
+    DB_CRED,
+    DB_HOST,
+    EMPLOYEES_PERSONAL_DETAILS
+)
+from bulk_upload.db import (
+    get_pool,
+    fetch_from_db,
+    create_job_entry
+)
+from bulk_upload.services.employee_processor import process_excel
+from bulk_upload.services.reference_data import load_reference_data
+from bulk_upload.benchmarks.workload import (
+    WORKLOAD_FORMATS,
+    generate_workload,
+    write_workload
+)
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+# Existing employees the generated rows report to
+MAX_EXISTING_HEADS = 100
+
+
+class PeakRSS:
+    """Samples the resident set size of this process on a thread, keeps the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="peak-rss", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "PeakRSS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+
+def server_statements(db_cred: tuple) -> int:
+    """Statements the server has executed so far (`Questions`), the stand-in DB should have no other clients."""
+    with get_pool(*db_cred).connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+            return int(cursor.fetchone()[1])
+
+
+def run_benchmark(
+    n_rows: int,
+    error_rate: float = 0.0,
+    in_file_head_rate: float = 0.1,
+    file_format: str = 'xlsx',
+    engine: str = 'auto',
+    dry_run: bool = False,
+    seed: int = 0,
+    db_cred: tuple = DB_CRED,
+) -> dict:
+    """Generate a workload of `n_rows`, run it through `process_excel` and measure it.
+    The whole `process_excel` call is timed, file parsing and preloads included, the workload
+    is generated and written first. `setup_s` is the part spent before the first batch went out."""
+
+    reference = load_reference_data(*db_cred)
+    heads = fetch_from_db(EMPLOYEES_PERSONAL_DETAILS, *db_cred, attributes=['emp_uuid'])
+    existing_heads = heads['emp_uuid'].cast(pl.Utf8).head(MAX_EXISTING_HEADS).to_list() if not heads.is_empty() else []
+
+    df = generate_workload(n_rows, reference, existing_heads, error_rate, in_file_head_rate, seed)
+
+    with tempfile.TemporaryDirectory(prefix="bulk_upload_bench_") as directory:
+        file_path = write_workload(df, directory, file_format)
+        del df
+
+        job_id = f"bench-{uuid.uuid4()}"
+        if not dry_run:
+            create_job_entry(job_id, n_rows, file_path, *db_cred)
+
+        metrics = {}
+        statements_before = server_statements(db_cred)
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            process_excel(
+                file_path,
+                job_id,
+                db_cred=db_cred,
+                file_format=file_format,
+                engine=engine,
+                dry_run=dry_run,
+                metrics=metrics
+            )
+            elapsed = time.perf_counter() - start
+        # minus the two `Questions` reads themselves
+        statements = server_statements(db_cred) - statements_before - 2
+
+    latencies = pl.Series(metrics['batch_latencies'], dtype=pl.Float64)
+
+    return {
+        'rows': n_rows,
+        'format': file_format,
+        'engine': engine,
+        'dry_run': dry_run,
+        'error_rate': error_rate,
+        'elapsed_s': round(elapsed, 3),
+        'setup_s': round(elapsed - metrics['elapsed'], 3),
+        'insert_s': round(metrics['elapsed'], 3),
+        'rows_per_s': round(n_rows / elapsed, 1) if elapsed else None,
+        'p50_batch_latency_ms': round(latencies.quantile(0.5) * 1000, 2) if latencies.len() else None,
+        'p99_batch_latency_ms': round(latencies.quantile(0.99) * 1000, 2) if latencies.len() else None,
+        'round_trips_per_row': round(statements / n_rows, 3),
+        'peak_rss_mb': round(rss.peak / 1024 / 1024, 1),
+        'counters': metrics['counters'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark process_excel on synthetic uploads.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000], help="workload sizes, 1k to 1M rows")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of rows broken on purpose")
+    parser.add_argument("--in-file-head-rate", type=float, default=0.1, help="share of rows reporting to a row of the same file")
+    parser.add_argument("--format", default="xlsx", choices=WORKLOAD_FORMATS)
+    parser.add_argument("--engine", default="auto", choices=("auto", "rows", "transactional", "staging"))
+    parser.add_argument("--dry-run", action="store_true", help="validate only, nothing is written to DB")
+    parser.add_argument("--seed", type=int, default=0, help="random picks only, ids are fresh on every run")
+    parser.add_argument("--allow-remote", action="store_true", help="run against a non-local DB_HOST")
+    args = parser.parse_args()
+
+    # Real runs insert thousands of synthetic employees
+    if not args.dry_run and DB_HOST not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(f"DB_HOST `{DB_HOST}` is not local, pass --allow-remote to benchmark against it")
+
+    reports = []
+    for n_rows in args.rows:
+        report = run_benchmark(
+            n_rows,
+            error_rate=args.error_rate,
+            in_file_head_rate=args.in_file_head_rate,
+            file_format=args.format,
+            engine=args.engine,
+            dry_run=args.dry_run,
+            seed=args.seed
+        )
+        print(f"[Bench] : {json.dumps(report)}")
+        reports.append(report)
+
+    print(pl.DataFrame(reports).drop('counters'))
+
+
+if __name__ == "__main__":
+    main()
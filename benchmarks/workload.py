@@ -0,0 +1,192 @@
+import os
+import uuid
+import numpy as np
+import polars as pl
+
+from bulk_upload.config import FIELD_MAP
+from bulk_upload.services.reference_data import ReferenceData
+
+# Ways a generated row is made to fail, each hits a different stage of the pipeline
+ERROR_KINDS = (
+    'missing_mandatory',    # clean_and_validate
+    'unknown_designation',  # resolve_slab_ids
+    'unknown_head',         # build_payloads head lookup
+    'invalid_email',        # pydantic validation
+    'duplicate_email',      # flag_duplicates
+)
+
+WORKLOAD_FORMATS = ('xlsx', 'csv', 'parquet')
+
+
+def _slab_combinations(reference: ReferenceData) -> pl.DataFrame:
+    """(designation, qualification, grade) triples that resolve to a work-ex slab,
+    matched the way `resolve_slab_ids` does it."""
+
+    designations = pl.DataFrame(
+        {
+            'designation': list(reference.designationMapping),
+            'fk_designation_id': list(reference.designationMapping.values()),
+        },
+        schema={'designation': pl.Utf8, 'fk_designation_id': pl.Int64}
+    ).unique(subset=['fk_designation_id'], keep='first', maintain_order=True)
+
+    qualification_slabs = (
+        reference.df_qualification
+        .select(
+            pl.col('slab_name').cast(pl.Utf8).alias('qualification'),
+            pl.col('fk_designation_id').cast(pl.Int64),
+            pl.col('id').cast(pl.Int64).alias('fk_qualification_slab'),
+        )
+        .unique(subset=['qualification', 'fk_designation_id'], keep='first', maintain_order=True)
+    )
+
+    combinations = (
+        reference.df_workExSlab
+        .select(
+            pl.col('grade').cast(pl.Utf8),
+            pl.col('fk_designation_id').cast(pl.Int64),
+            pl.col('fk_qualification_slab').cast(pl.Int64),
+        )
+        .join(qualification_slabs, on=['fk_designation_id', 'fk_qualification_slab'])
+        .join(designations, on='fk_designation_id')
+        # values the cleaning stage would change never match
+        .filter(
+            (pl.col('grade') == pl.col('grade').str.strip_chars().str.to_uppercase())
+            & (pl.col('designation') == pl.col('designation').str.strip_chars())
+        )
+        .select('designation', 'qualification', 'grade')
+    )
+
+    if combinations.is_empty():
+        raise ValueError("No designation / qualification / work-ex slab combination resolves in the master tables")
+    return combinations
+
+
+def generate_workload(
+    n_rows: int,
+    reference: ReferenceData,
+    existing_heads: list,
+    error_rate: float = 0.0,
+    in_file_head_rate: float = 0.1,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """Synthetic upload of `n_rows` employees with the `FIELD_MAP` columns.
+
+    Every master-table reference is drawn from `reference`, so rows resolve
+    unless they are picked for an error. About `error_rate` of the rows are
+    broken in one of the `ERROR_KINDS` ways. Heads come from `existing_heads`
+    (emp_uuids already in DB), and `in_file_head_rate` of the rows report to
+    an earlier row of the same file, which exercises the hierarchy waves.
+
+    `seed` only drives the random picks. emp_ids, emails and mobiles carry a
+    fresh run prefix on every call, so workloads never collide with the
+    employees an earlier benchmark inserted.
+    """
+
+    if not existing_heads:
+        raise ValueError("The database needs at least one employee to act as top-level head")
+
+    rng = np.random.default_rng(seed)
+    run = uuid.uuid4()
+    prefix = run.hex[:10]
+    mobile_base = 6_000_000_000 + run.int % (4_000_000_000 - n_rows)
+    idx = np.arange(n_rows)
+
+    def _pick(values, size=n_rows):
+        values = list(values)
+        if not values:
+            raise ValueError("A master table the workload draws from is empty")
+        return [values[i] for i in rng.integers(0, len(values), size)]
+
+    combinations = _slab_combinations(reference).to_dicts()
+    slabs = _pick(combinations)
+
+    emp_ids = [f"BENCH{prefix.upper()}{i:07d}" for i in idx]
+
+    # Heads: an existing employee, or an earlier row of this file
+    heads = _pick(existing_heads)
+    in_file = (rng.random(n_rows) < in_file_head_rate) & (idx > 0)
+    for i in np.flatnonzero(in_file):
+        heads[i] = emp_ids[int(rng.integers(0, i))]
+
+    df = pl.DataFrame({
+        'email': [f"bench.{prefix}.{i}@example.com" for i in idx],
+        'mobile_no': [str(mobile_base + i) for i in idx],
+        'title': _pick(('mr', 'ms', 'mrs')),
+        'first_name': _pick(('Asha', 'Ravi', 'Meera', 'Arjun', 'Kavya', 'Rohan')),
+        'middle_name': _pick((None, 'Kumar', 'Devi')),
+        'last_name': _pick(('Sharma', 'Iyer', 'Reddy', 'Das', 'Patel')),
+        'gender': _pick(('male', 'female')),
+        'is_married': _pick(('Yes', 'No')),
+        'date_of_birth': _pick(('1985-04-12', '1990-09-30', '1994-01-05')),
+        'age': rng.integers(22, 60, n_rows),
+        'emp_id': emp_ids,
+        'DOJ': _pick(('2019-07-01', '2021-03-15', '2023-11-20')),
+        'new_hierarchical_designation': [slab['designation'] for slab in slabs],
+        'new_functional_role': _pick(reference.funcRolesMapping),
+        'role_for_ipp_calculation': _pick(('Sales', 'Support')),
+        'department_ind_performance_pay': _pick(('Sales', 'Support')),
+        'department': _pick(reference.deptMapping),
+        'region': _pick(reference.regionsMapping),
+        'branch': _pick(reference.branchMapping),
+        'location': _pick(reference.locationsMapping),
+        'zone': _pick(reference.zonesMapping),
+        'year_of_passing': _pick(('2010', '2015', '2018')),
+        'scale_considered': [slab['qualification'] for slab in slabs],
+        'final_slab_considered': [slab['grade'] for slab in slabs],
+        'is_trainee': _pick(('0', '1')),
+        'is_additional_sa': _pick(('0', '1')),
+        'is_super_annuation': _pick(('0', '1')),
+        'annual_bonus': rng.integers(0, 50_000, n_rows).astype(float),
+        'adhoc_allowance': rng.integers(0, 5_000, n_rows).astype(float),
+        'adhoc_type': _pick(('Default', 'Manual')),
+        'remarks_onboarding': _pick((None, 'benchmark')),
+        'remarks_salary_allocation': _pick((None, 'benchmark')),
+        'sub_designation': _pick(reference.subDesignationsMapping),
+        'national_head_emp_name': ['Benchmark Head'] * n_rows,
+        'national_head_emp_id': heads,
+        'country_head_emp_name': ['Benchmark Head'] * n_rows,
+        'country_head_emp_id': heads,
+    }, strict=False)
+
+    # ---- Error injection ----
+    broken = np.flatnonzero(rng.random(n_rows) < error_rate)
+    if broken.size:
+        kinds = np.array(_pick(ERROR_KINDS, broken.size))
+        overrides = {
+            'email': pl.when(pl.int_range(pl.len()).is_in(broken[kinds == 'missing_mandatory'].tolist()))
+                     .then(pl.lit(None, pl.Utf8))
+                     .when(pl.int_range(pl.len()).is_in(broken[kinds == 'invalid_email'].tolist()))
+                     .then(pl.lit('not-an-email'))
+                     .when(pl.int_range(pl.len()).is_in(broken[kinds == 'duplicate_email'].tolist()))
+                     .then(pl.lit(f"bench.{prefix}.0@example.com"))
+                     .otherwise(pl.col('email')),
+            'new_hierarchical_designation': pl.when(pl.int_range(pl.len()).is_in(broken[kinds == 'unknown_designation'].tolist()))
+                     .then(pl.lit('Unknown Designation'))
+                     .otherwise(pl.col('new_hierarchical_designation')),
+            'national_head_emp_id': pl.when(pl.int_range(pl.len()).is_in(broken[kinds == 'unknown_head'].tolist()))
+                     .then(pl.lit('NO-SUCH-HEAD'))
+                     .otherwise(pl.col('national_head_emp_id')),
+        }
+        df = df.with_columns(**overrides)
+
+    return df.select(list(FIELD_MAP))
+
+
+def write_workload(df: pl.DataFrame, directory: str, file_format: str = 'xlsx') -> str:
+    """Write a generated workload the way HR would upload it. Returns the file path."""
+
+    if file_format not in WORKLOAD_FORMATS:
+        raise ValueError(f"Unknown workload format `{file_format}`, expected one of {WORKLOAD_FORMATS}")
+
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, f"workload_{df.height}.{file_format}")
+
+    if file_format == 'xlsx':
+        df.write_excel(file_path)
+    elif file_format == 'csv':
+        df.write_csv(file_path)
+    else:
+        df.write_parquet(file_path)
+
+    return file_path
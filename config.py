@@ -1,4 +1,5 @@
 import os 
+import tempfile
 
 from dotenv import load_dotenv
 from bulk_upload.models import (
@@ -30,6 +31,8 @@ DB_CRED = DB_HOST, DB_USER, DB_PASSWORD, DATABASE, int(DB_PORT)
 
 # mmt_uploadprocess_logs updation
 BATCH_UPDATE_SIZE = int(os.getenv("BATCH_UPDATE_SIZE"))
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", 2))   # seconds between progress flushes
+PROGRESS_MAX_BACKOFF = float(os.getenv("PROGRESS_MAX_BACKOFF", 60))         # longest wait between failing progress flushes
 
 # Table Names
 DG_DESIGNATIONS = 'dg_designations'
@@ -52,6 +55,10 @@ EMPLOYEES_QUALIFICATIONS = 'mmt_emp_qualifications'
 EMPLOYEES_WORKEX = 'mmt_emp_work_experiences'
 EMPLOYEES_SALARY_ALLOCATIONS = 'mmt_salary_allocations'   
 UPLOAD_PROCESS_LOGS = 'mmt_uploadprocess_logs'
+UPLOAD_PROCESS_CHECKPOINTS = 'mmt_uploadprocess_checkpoints'
+
+# Tables holding one row per employee through `fk_emp_id`, written after `mmt_employees`
+DEPENDENT_TABLES = (ONBOARDED_COMPANYINFO, EMPLOYEES_SALARY_ALLOCATIONS)
 
 # Mappings
 DESIGNATION_MAPP = {
@@ -190,5 +197,50 @@ PROMOTED_DESIGNATION_ID_DEFAULT = None
 # Batch Settings
 BATCH_WORKERS = 5
 
+# Background Upload Jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_FILES_DIR = os.getenv("JOB_FILES_DIR", os.path.join(tempfile.gettempdir(), "bulk_upload_jobs"))
+
+# Upload Spooling
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))         # bytes read per chunk
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 50 * 1024 * 1024))      # uploads above this are rejected
+
+# Reference Data Cache
+# Seconds a cached master table is trusted before its row count / max id is re-checked
+REFERENCE_CACHE_TTL_DEFAULT = float(os.getenv("REFERENCE_CACHE_TTL", 300))
+REFERENCE_CACHE_TTL = {
+    DG_DESIGNATIONS: 3600,
+    QUALIFICATION: 3600,
+    SLAB_MASTER: 3600,
+}
+
+# Streaming Excel Input
+EXCEL_CHUNK_SIZE = int(os.getenv("EXCEL_CHUNK_SIZE", 5000))                          # rows per streamed chunk
+EXCEL_STREAMING_MIN_BYTES = int(os.getenv("EXCEL_STREAMING_MIN_BYTES", 10 * 1024 * 1024))  # .xlsx uploads above this are streamed
+
+# Staging-table load path
+STAGING_MIN_ROWS = int(os.getenv("STAGING_MIN_ROWS", 5000))   # chunks this large are loaded set-based
+
+# Chunk-level transactions: employees committed together across the three target tables
+TRANSACTION_CHUNK_SIZE = int(os.getenv("TRANSACTION_CHUNK_SIZE", 50))
+
+# Rows submitted to the workers but not yet collected, two transaction batches per worker by default.
+# Never below one batch per worker, so larger batches (sync) still keep every worker busy.
+MAX_IN_FLIGHT_ROWS = int(os.getenv("MAX_IN_FLIGHT_ROWS", BATCH_WORKERS * TRANSACTION_CHUNK_SIZE * 2))
+
+# Sync mode: existing employees diffed and upserted per batch
+SYNC_CHUNK_SIZE = int(os.getenv("SYNC_CHUNK_SIZE", 1000))
+
+# Values per `IN (...)` lookup of the duplicate check
+DEDUP_QUERY_BATCH = int(os.getenv("DEDUP_QUERY_BATCH", 1000))
+
+# Rows per multi-VALUES INSERT statement
+INSERT_CHUNK_SIZE = int(os.getenv("INSERT_CHUNK_SIZE", 500))
+
+# Connection Pool Settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", JOB_WORKERS * (BATCH_WORKERS + 1) + 2))   # workers + progress writer per job
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))             # seconds to wait for a free connection
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", 1800))           # seconds before a connection is replaced
+DB_POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", 60)) # idle seconds before a health check ping
 
 
@@ -1,10 +1,230 @@
+import time
 import datetime
+import threading
 import pymysql
 import polars as pl
 
-from typing import List, Optional
+from collections import deque
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Union
 from bulk_upload.config import DB_CRED
-from bulk_upload.config import UPLOAD_PROCESS_LOGS
+from bulk_upload.config import UPLOAD_PROCESS_LOGS, UPLOAD_PROCESS_CHECKPOINTS
+from bulk_upload.config import (
+    INSERT_CHUNK_SIZE,
+    DEDUP_QUERY_BATCH,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PING_INTERVAL
+)
+
+# connection pool
+class ConnectionPool:
+    """Thread-safe pool of pymysql connections for one set of credentials.
+
+    Idle connections are pinged before reuse once they have been idle for
+    `ping_interval` seconds and are replaced once older than `recycle` seconds.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        database: str,
+        port: int = 3306,
+        size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        recycle: float = DB_POOL_RECYCLE,
+        ping_interval: float = DB_POOL_PING_INTERVAL,
+    ) -> None:
+
+        self._connect_kwargs = dict(
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            port=port,
+            autocommit=False,
+        )
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()        # (conn, created_at, last_used)
+        self._created_at = {}       # id(conn) -> created_at, for borrowed connections
+        self._open = 0
+        self._stats = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'borrowed': 0,
+            'returned': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'waits': 0,
+            'timeouts': 0,
+        }
+
+    def _connect(self):
+        conn = pymysql.connect(**self._connect_kwargs)
+        with self._cond:
+            self._stats['connections_created'] += 1
+        return conn
+
+    def _close(self, conn, keep_slot: bool = False) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['connections_closed'] += 1
+            if not keep_slot:
+                self._open -= 1
+                self._cond.notify()
+
+    def acquire(self):
+        """Borrow a connection, blocking up to `timeout` seconds when the pool is exhausted."""
+
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise TimeoutError(
+                        f"No DB connection available within {self.timeout}s (pool size {self.size})"
+                    )
+                self._stats['waits'] += 1
+                self._cond.wait(remaining)
+
+        now = time.monotonic()
+
+        # Stale or unhealthy connections are replaced in the same slot
+        if conn is not None and now - created_at > self.recycle:
+            with self._cond:
+                self._stats['recycled'] += 1
+            self._close(conn, keep_slot=True)
+            conn = None
+
+        elif conn is not None and now - last_used > self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._stats['health_check_failures'] += 1
+                self._close(conn, keep_slot=True)
+                conn = None
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            created_at = now
+
+        with self._cond:
+            self._created_at[id(conn)] = created_at
+            self._stats['borrowed'] += 1
+        return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Return a borrowed connection. Broken or discarded connections are closed."""
+
+        with self._cond:
+            created_at = self._created_at.pop(id(conn), time.monotonic())
+            self._stats['returned'] += 1
+
+        if not discard and conn.open:
+            try:
+                # End any open read snapshot so the next borrower sees fresh data
+                conn.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if discard:
+            self._close(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block."""
+
+        conn = self.acquire()
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                **self._stats,
+            }
+
+    def close_all(self) -> None:
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# get (or create) the shared pool for a set of credentials
+def get_pool(
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> ConnectionPool:
+
+    key = (host, user, password, database, port)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(host, user, password, database, port)
+            _pools[key] = pool
+        return pool
+
+# pool statistics for every pool opened by this process
+def get_pool_stats() -> list[dict]:
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [
+        {'host': host, 'database': database, 'port': port, **pool.stats()}
+        for (host, _user, _password, database, port), pool in pools
+    ]
 
 # fetch from db
 def fetch_from_db(
@@ -17,27 +237,17 @@ def fetch_from_db(
     attributes: list = [],
 ) -> pl.DataFrame:
 
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        port=port,
-        cursorclass=pymysql.cursors.DictCursor
-    )
-
-    with conn.cursor() as cursor:
-        if attributes:
-            try:
-                cursor.execute(f"SELECT {','.join(attributes)} FROM `{table}`;")
-            except Exception:
+    with get_pool(host, user, password, database, port).connection() as conn:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            if attributes:
+                try:
+                    cursor.execute(f"SELECT {','.join(attributes)} FROM `{table}`;")
+                except Exception:
+                    cursor.execute(f"SELECT * FROM `{table}`;")
+            else:
                 cursor.execute(f"SELECT * FROM `{table}`;")
-        else:
-            cursor.execute(f"SELECT * FROM `{table}`;")
-
-        rows = cursor.fetchall()
 
-    conn.close()
+            rows = cursor.fetchall()
 
     # Normalize datetime → string
     for row in rows:
@@ -47,6 +257,33 @@ def fetch_from_db(
 
     return pl.DataFrame(rows)
 
+# row count and max key per table, one round trip
+def fetch_table_fingerprints(
+    tables: dict,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> dict:
+    """`tables` maps table -> key column. Returns table -> (row_count, max_key)."""
+
+    if not tables:
+        return {}
+
+    query = " UNION ALL ".join(
+        f"SELECT %s AS tbl, COUNT(*) AS row_count, MAX(`{key}`) AS max_key FROM `{table}`"
+        for table, key in tables.items()
+    )
+
+    with get_pool(host, user, password, database, port).connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, list(tables.keys()))
+            rows = cursor.fetchall()
+
+    return {table: (row_count, max_key) for table, row_count, max_key in rows}
+
+
 # insert into db
 def insert_into_db(
     df: pl.DataFrame,
@@ -63,54 +300,131 @@ def insert_into_db(
         raise ValueError("DataFrame is empty — nothing to insert.")
 
     if df.height != 1:
-        raise ValueError("This function supports exactly one row per insert.")
-
-    # Lock column order
-    columns = attributes if attributes else list(df.columns)
-
-    # Validate columns
-    missing_cols = set(columns) - set(df.columns)
-    if missing_cols:
-        raise ValueError(f"Columns missing in DataFrame: {missing_cols}")
-
-    # Build INSERT query
-    col_str = ", ".join(f"`{c}`" for c in columns)
-    placeholders = ", ".join(["%s"] * len(columns))
-    insert_query = f"""
-        INSERT INTO `{table}` ({col_str})
-        VALUES ({placeholders})
+        raise ValueError("This function supports exactly one row per insert, use insert_many_into_db for batches.")
+
+    return insert_many_into_db(
+        df,
+        table,
+        host,
+        user,
+        password,
+        database,
+        port,
+        columns=attributes,
+    )[0]
+
+
+# insert many rows into db
+def insert_many_into_db(
+    rows: Union[pl.DataFrame, Sequence[tuple], Sequence[dict]],
+    table: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    columns: Optional[List[str]] = None,
+    chunk_size: int = INSERT_CHUNK_SIZE,
+    conn=None,
+    update_columns: Optional[List[str]] = None,
+) -> List[Optional[int]]:
+    """Insert many rows with multi-VALUES statements, `chunk_size` rows per statement.
+
+    `rows` may be a DataFrame, a list of tuples (`columns` required) or a list
+    of dicts. Dicts are grouped by their key set so that omitted keys keep
+    their DB defaults, as `model_dump(exclude_none=True)` payloads expect.
+
+    Returns the generated auto-increment ids in input row order (None when the
+    table has no auto-increment column). Each chunk is committed on its own;
+    pass `conn` to run inside a caller-managed transaction instead.
+
+    With `update_columns` the statements become upserts: rows hitting an
+    existing primary or unique key update those of the columns they carry
+    instead. The returned ids are then only meaningful for inserted rows.
     """
 
-    # Extract single row
-    values = (
-        df
-        .select(columns)
-        .to_numpy()
-        .tolist()[0]
-    )
-
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        port=port,
-        autocommit=False
-    )
-
-    try:
+    if isinstance(rows, pl.DataFrame):
+        if rows.is_empty():
+            raise ValueError("DataFrame is empty — nothing to insert.")
+        columns = columns if columns else list(rows.columns)
+        missing_cols = set(columns) - set(rows.columns)
+        if missing_cols:
+            raise ValueError(f"Columns missing in DataFrame: {missing_cols}")
+        groups = [(columns, list(range(rows.height)), rows.select(columns).rows())]
+
+    elif rows and isinstance(rows[0], dict):
+        by_keys = {}
+        for idx, row in enumerate(rows):
+            keys = tuple(columns) if columns else tuple(row.keys())
+            by_keys.setdefault(keys, ([], []))
+            by_keys[keys][0].append(idx)
+            by_keys[keys][1].append(tuple(row.get(c) for c in keys))
+        groups = [(list(keys), idxs, values) for keys, (idxs, values) in by_keys.items()]
+
+    elif rows:
+        if not columns:
+            raise ValueError("`columns` is required when inserting tuples.")
+        groups = [(columns, list(range(len(rows))), [tuple(r) for r in rows])]
+
+    else:
+        raise ValueError("No rows to insert.")
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    new_ids = [None] * sum(len(idxs) for _, idxs, _ in groups)
+
+    def _insert(conn, commit: bool) -> None:
         with conn.cursor() as cursor:
-            cursor.execute(insert_query, values)
-            new_id = cursor.lastrowid
-        conn.commit()
-        return new_id
-
-    except Exception as e:
-        conn.rollback()
-        raise RuntimeError(f"Insert failed: {e}")
-
-    finally:
-        conn.close()
+            # multi-row INSERTs get consecutive ids spaced by auto_increment_increment,
+            # read once per connection
+            step = getattr(conn, '_auto_increment_increment', None)
+            if step is None:
+                cursor.execute("SELECT @@auto_increment_increment")
+                step = cursor.fetchone()[0]
+                conn._auto_increment_increment = step
+
+            for cols, idxs, values in groups:
+                col_str = ", ".join(f"`{c}`" for c in cols)
+                placeholders = "(" + ", ".join(["%s"] * len(cols)) + ")"
+
+                upsert = ""
+                if update_columns:
+                    updates = [c for c in cols if c in update_columns]
+                    if updates:
+                        upsert = "ON DUPLICATE KEY UPDATE " + ", ".join(f"`{c}` = VALUES(`{c}`)" for c in updates)
+
+                for start in range(0, len(values), chunk_size):
+                    chunk = values[start:start + chunk_size]
+                    insert_query = f"""
+                        INSERT INTO `{table}` ({col_str})
+                        VALUES {", ".join([placeholders] * len(chunk))}
+                        {upsert}
+                    """
+                    try:
+                        cursor.execute(
+                            insert_query,
+                            [v for row in chunk for v in row]
+                        )
+                        if commit:
+                            conn.commit()
+                    except Exception as e:
+                        if commit:
+                            conn.rollback()
+                        raise RuntimeError(f"Insert failed: {e}")
+
+                    first_id = cursor.lastrowid
+                    if first_id:
+                        for offset, idx in enumerate(idxs[start:start + chunk_size]):
+                            new_ids[idx] = first_id + offset * step
+
+    if conn is not None:
+        _insert(conn, commit=False)
+    else:
+        with get_pool(host, user, password, database, port).connection() as conn:
+            _insert(conn, commit=True)
+
+    return new_ids
 
 
 # create_job_entry
@@ -138,29 +452,46 @@ def create_job_entry(
         VALUES (%s, %s, 0, %s, 'PENDING', 0)
     """
 
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        port=port,
-        autocommit=False,
-    )
+    with get_pool(host, user, password, database, port).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    query,
+                    (process_id, total_record, uploaded_file_name)
+                )
+            conn.commit()
 
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute(
-                query,
-                (process_id, total_record, uploaded_file_name)
-            )
-        conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to create job entry: {e}")
 
-    except Exception as e:
-        conn.rollback()
-        raise RuntimeError(f"Failed to create job entry: {e}")
 
-    finally:
-        conn.close()
+# fetch job status
+def fetch_job_status(
+    process_id: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> Optional[dict]:
+
+    query = f"""
+        SELECT
+            process_id,
+            total_record,
+            records_completed,
+            uploaded_file_name,
+            status
+        FROM {UPLOAD_PROCESS_LOGS}
+        WHERE process_id = %s
+          AND is_deleted = 0
+    """
+
+    with get_pool(host, user, password, database, port).connection() as conn:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(query, (process_id,))
+            return cursor.fetchone()
 
 
 # update job progress
@@ -172,7 +503,10 @@ def update_job_progress(
     password: str,
     database: str,
     port: int = 3306,
+    conn=None,
 ) -> None:
+    """Add `completed_inc` to the job's records_completed and commit.
+    Pass `conn` to write on a connection the caller holds instead of a pooled one."""
 
     query = f"""
         UPDATE {UPLOAD_PROCESS_LOGS}
@@ -183,35 +517,93 @@ def update_job_progress(
           AND is_deleted = 0
     """
 
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        port=port,
-        autocommit=False,
-    )
+    def _update(conn) -> None:
+        try:
+            with conn.cursor() as cursor:
+                affected = cursor.execute(
+                    query,
+                    (completed_inc, process_id)
+                )
 
-    try:
-        with conn.cursor() as cursor:
-            affected = cursor.execute(
-                query,
-                (completed_inc, process_id)
-            )
-
-            if affected == 0:
-                raise ValueError(
-                    f"No active job found with process_id={process_id}"
+                if affected == 0:
+                    raise ValueError(
+                        f"No active job found with process_id={process_id}"
+                    )
+
+            conn.commit()
+
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to update job progress: {e}") from e
+
+    if conn is not None:
+        _update(conn)
+    else:
+        with get_pool(host, user, password, database, port).connection() as conn:
+            _update(conn)
+
+
+# final progress and terminal status in one statement
+def finish_job(
+    process_id: str,
+    completed_inc: int,
+    status: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    conn=None,
+    total_record: int | None = None,
+) -> None:
+    """Add the last `completed_inc` records and set the terminal `status` ('COMPLETED' / 'FAILED') atomically.
+    A completed job can no longer be resumed, its checkpoints are deleted in the same transaction.
+    `total_record` replaces the total the job was created with, when it was only an estimate.
+    Pass `conn` to write on a connection the caller holds instead of a pooled one."""
+
+    if status not in ('COMPLETED', 'FAILED'):
+        raise ValueError(f"Unknown terminal status `{status}`")
+
+    query = f"""
+        UPDATE {UPLOAD_PROCESS_LOGS}
+        SET
+            records_completed = records_completed + %s,
+            total_record = COALESCE(%s, total_record),
+            status = %s
+        WHERE process_id = %s
+          AND is_deleted = 0
+    """
+
+    def _finish(conn) -> None:
+        try:
+            with conn.cursor() as cursor:
+                affected = cursor.execute(
+                    query,
+                    (completed_inc, total_record, status, process_id)
                 )
 
-        conn.commit()
+                if affected == 0:
+                    raise ValueError(
+                        f"No active job found with process_id={process_id}"
+                    )
+
+                if status == 'COMPLETED':
+                    cursor.execute(
+                        f"DELETE FROM {UPLOAD_PROCESS_CHECKPOINTS} WHERE process_id = %s",
+                        (process_id,)
+                    )
+
+            conn.commit()
 
-    except Exception as e:
-        conn.rollback()
-        raise RuntimeError(f"Failed to update job progress: {e}")
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to mark job {status.lower()}: {e}")
 
-    finally:
-        conn.close()
+    if conn is not None:
+        _finish(conn)
+    else:
+        with get_pool(host, user, password, database, port).connection() as conn:
+            _finish(conn)
 
 
 # mark job completed 
@@ -231,32 +623,22 @@ def mark_job_completed(
           AND is_deleted = 0
     """
 
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        port=port,
-        autocommit=False,
-    )
-
-    try:
-        with conn.cursor() as cursor:
-            affected = cursor.execute(query, (process_id,))
+    with get_pool(host, user, password, database, port).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                affected = cursor.execute(query, (process_id,))
 
-            if affected == 0:
-                raise ValueError(
-                    f"No active job found with process_id={process_id}"
-                )
+                if affected == 0:
+                    raise ValueError(
+                        f"No active job found with process_id={process_id}"
+                    )
 
-        conn.commit()
+            conn.commit()
 
-    except Exception as e:
-        conn.rollback()
-        raise RuntimeError(f"Failed to mark job completed: {e}")
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to mark job completed: {e}")
 
-    finally:
-        conn.close()
 
 # mark job failed
 def mark_job_failed(
@@ -275,30 +657,228 @@ def mark_job_failed(
           AND is_deleted = 0
     """
 
-    conn = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        port=port,
-        autocommit=False,
-    )
+    with get_pool(host, user, password, database, port).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                affected = cursor.execute(query, (process_id,))
+
+                if affected == 0:
+                    raise ValueError(
+                        f"No active job found with process_id={process_id}"
+                    )
+
+            conn.commit()
 
-    try:
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to mark job failed: {e}")
+
+
+# primary key column of a table, looked up once per table
+_primary_keys = {}
+_primary_keys_lock = threading.Lock()
+
+def fetch_primary_key(
+    table: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> str:
+
+    key = (host, database, port, table)
+    with _primary_keys_lock:
+        if key in _primary_keys:
+            return _primary_keys[key]
+
+    with get_pool(host, user, password, database, port).connection() as conn:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(f"SHOW KEYS FROM `{table}` WHERE Key_name = 'PRIMARY'")
+            columns = [row['Column_name'] for row in cursor.fetchall()]
+
+    if len(columns) != 1:
+        raise RuntimeError(f"`{table}` needs a single-column primary key, found {columns}")
+
+    with _primary_keys_lock:
+        _primary_keys[key] = columns[0]
+    return columns[0]
+
+
+# values of `column` already present in `table`
+def fetch_existing_values(
+    table: str,
+    column: str,
+    values: Sequence,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    batch_size: int = DEDUP_QUERY_BATCH,
+) -> list:
+    """Return the `values` found in `table`.`column`, `batch_size` values per `IN (...)` query,
+    all on one pooled connection. Values come back as stored in DB."""
+
+    found = []
+    if not values:
+        return found
+
+    values = list(values)
+    with get_pool(host, user, password, database, port).connection() as conn:
         with conn.cursor() as cursor:
-            affected = cursor.execute(query, (process_id,))
+            for start in range(0, len(values), batch_size):
+                batch = values[start:start + batch_size]
+                cursor.execute(
+                    f"SELECT DISTINCT `{column}` FROM `{table}` WHERE `{column}` IN ({', '.join(['%s'] * len(batch))})",
+                    batch
+                )
+                found.extend(value for (value,) in cursor.fetchall())
+
+    return found
+
+
+def fetch_value_owners(
+    table: str,
+    column: str,
+    owner_column: str,
+    values: Sequence,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    batch_size: int = DEDUP_QUERY_BATCH,
+) -> dict:
+    """Like `fetch_existing_values`, but return {value: `owner_column` of the row holding it}
+    for the `values` found in `table`.`column`."""
 
-            if affected == 0:
-                raise ValueError(
-                    f"No active job found with process_id={process_id}"
+    owners = {}
+    if not values:
+        return owners
+
+    values = list(values)
+    with get_pool(host, user, password, database, port).connection() as conn:
+        with conn.cursor() as cursor:
+            for start in range(0, len(values), batch_size):
+                batch = values[start:start + batch_size]
+                cursor.execute(
+                    f"SELECT `{column}`, `{owner_column}` FROM `{table}` WHERE `{column}` IN ({', '.join(['%s'] * len(batch))})",
+                    batch
                 )
+                owners.update(cursor.fetchall())
+
+    return owners
+
+
+# ---- Job checkpoints ----
+# One row per upload row committed by a job, written in the same transaction as the employee.
+# Only kept while the job can be resumed, `finish_job` deletes them when it completes.
+
+def ensure_checkpoint_table(
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> None:
+    """Create the checkpoint table when missing. DDL commits implicitly, run it outside data transactions."""
 
-        conn.commit()
+    query = f"""
+        CREATE TABLE IF NOT EXISTS {UPLOAD_PROCESS_CHECKPOINTS}
+        (
+            process_id VARCHAR(64) NOT NULL,
+            row_index INT UNSIGNED NOT NULL,
+            emp_id BIGINT NOT NULL,
+            PRIMARY KEY (process_id, row_index)
+        )
+    """
 
-    except Exception as e:
-        conn.rollback()
-        raise RuntimeError(f"Failed to mark job failed: {e}")
+    with get_pool(host, user, password, database, port).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+            conn.commit()
+
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to create checkpoint table: {e}")
+
+
+def insert_job_checkpoints(
+    process_id: str,
+    row_indices: Sequence[int],
+    emp_ids: Sequence[int],
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    conn=None,
+) -> None:
+    """Record the upload rows `row_indices` of a job as done, with the emp_ids they produced.
+    Pass `conn` to write inside the transaction that inserted the employees."""
+
+    if not row_indices:
+        return
+
+    insert_many_into_db(
+        [(process_id, int(row_index), emp_id) for row_index, emp_id in zip(row_indices, emp_ids)],
+        UPLOAD_PROCESS_CHECKPOINTS,
+        host, user, password, database, port,
+        columns=['process_id', 'row_index', 'emp_id'],
+        conn=conn
+    )
+
+
+def fetch_job_checkpoints(
+    process_id: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> dict:
+    """Upload rows a job already committed: row_index -> emp_id."""
+
+    query = f"""
+        SELECT row_index, emp_id
+        FROM {UPLOAD_PROCESS_CHECKPOINTS}
+        WHERE process_id = %s
+    """
+
+    with get_pool(host, user, password, database, port).connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, (process_id,))
+            return dict(cursor.fetchall())
+
+
+def restart_job(
+    process_id: str,
+    records_completed: int,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> None:
+    """Put a job back to PROCESSING for a resume, `records_completed` rows already done."""
+
+    query = f"""
+        UPDATE {UPLOAD_PROCESS_LOGS}
+        SET
+            records_completed = %s,
+            status = 'PROCESSING'
+        WHERE process_id = %s
+          AND is_deleted = 0
+    """
 
-    finally:
-        conn.close()
+    with get_pool(host, user, password, database, port).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query, (records_completed, process_id))
+            conn.commit()
 
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Failed to restart job: {e}")
@@ -0,0 +1,63 @@
+import threading
+import polars as pl
+
+from bulk_upload.config import EMPLOYEES_PERSONAL_DETAILS
+from bulk_upload.db import fetch_from_db
+
+
+class EmployeeIndex:
+    """Thread-safe emp_uuid -> emp_id lookup shared by all workers of a job.
+
+    Loaded once per job with only the two columns it needs and kept current
+    by calling `add` with the `lastrowid` of every `mmt_employees` insert.
+    """
+
+    def __init__(self, mapping: dict | None = None) -> None:
+        self._lock = threading.Lock()
+        self._ids = dict(mapping) if mapping else {}
+
+    @classmethod
+    def load(
+        cls,
+        host: str,
+        user: str,
+        password: str,
+        database: str,
+        port: int = 3306,
+    ) -> "EmployeeIndex":
+
+        df_employees = fetch_from_db(
+            EMPLOYEES_PERSONAL_DETAILS,
+            host, user, password, database, port,
+            attributes=['emp_id', 'emp_uuid']
+        )
+        if df_employees.is_empty():
+            return cls()
+
+        return cls(zip(
+            df_employees['emp_uuid'].cast(pl.Utf8).to_list(),
+            df_employees['emp_id'].to_list()
+        ))
+
+    def get(self, emp_uuid) -> int | None:
+        if emp_uuid is None:
+            return None
+        with self._lock:
+            return self._ids.get(str(emp_uuid))
+
+    def add(self, emp_uuid, emp_id: int) -> None:
+        with self._lock:
+            self._ids[str(emp_uuid)] = emp_id
+
+    def __contains__(self, emp_uuid) -> bool:
+        with self._lock:
+            return str(emp_uuid) in self._ids
+
+    def contains_many(self, emp_uuids) -> list[bool]:
+        """Membership of many emp_uuids under a single lock."""
+        with self._lock:
+            return [emp_uuid is not None and str(emp_uuid) in self._ids for emp_uuid in emp_uuids]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
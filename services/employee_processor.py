@@ -1,5 +1,6 @@
 import time
 import polars as pl
+from itertools import islice
 import warnings
 warnings.filterwarnings("ignore", message="Could not determine dtype")
 
@@ -7,14 +8,49 @@ from bulk_upload.config import *
 from datetime import datetime
 from concurrent.futures import (
     ThreadPoolExecutor, 
-    as_completed
+    FIRST_COMPLETED,
+    as_completed,
+    wait
 )
 from bulk_upload.db import (
-    fetch_from_db,
-    insert_into_db,
-    update_job_progress,
-    mark_job_completed,
-    mark_job_failed
+    get_pool,
+    insert_many_into_db,
+    fetch_existing_values,
+    fetch_value_owners,
+    ensure_checkpoint_table,
+    insert_job_checkpoints,
+    fetch_job_checkpoints,
+    restart_job
+)
+from bulk_upload.services.employee_index import EmployeeIndex
+from bulk_upload.services.job_context import (
+    JobContext,
+    ROW_INDEX_COLUMN
+)
+from bulk_upload.services.reference_data import load_reference_data
+from bulk_upload.services.hierarchy import hierarchy_waves
+from bulk_upload.services.progress_reporter import ProgressReporter
+from bulk_upload.services.validation import validate_batch
+from bulk_upload.services.staging_loader import stage_and_load
+from bulk_upload.services.sync import sync_employees
+from bulk_upload.services.transactional_writer import (
+    write_employees_bulk,
+    write_employees_transactional
+)
+from bulk_upload.services.readers import (
+    detect_format,
+    read_upload,
+    iter_upload_chunks
+)
+from bulk_upload.services.preprocess import (
+    RESOLVED_COLUMNS,
+    SYNC_UPDATE_COLUMN,
+    DEDUP_KEYS,
+    clean_and_validate,
+    resolve_slab_ids,
+    dedup_values,
+    flag_duplicates,
+    split_failed
 )
 from bulk_upload.models import (
     MMTEmployeePayload,
@@ -24,120 +60,58 @@ from bulk_upload.models import (
 )
 
 
-def process_record(row) -> tuple[bool, list]:
+# emp_id given to employees validated in a dry run, they are never inserted
+DRY_RUN_EMP_ID = 0
 
-    """Process a single record and insert into DB.
-    Returns a list of failed records (empty if successful)."""
 
-    # Preload Employees emp_id and emp_uuid mapping 
-    # Should get refresh as new employee is added
-    # Employee Table
-    global df_employees
-    df_employees = fetch_from_db(
-        EMPLOYEES_PERSONAL_DETAILS,
-        *DB_CRED
-    ).select(['emp_id', 'emp_uuid'])
+# Target table -> payload model, in insertion order
+PAYLOAD_MODELS = (
+    (EMPLOYEES_PERSONAL_DETAILS, MMTEmployeePayload),
+    (ONBOARDED_COMPANYINFO, EmployeeOnboardingCreate),
+    (EMPLOYEES_SALARY_ALLOCATIONS, MMTSalaryAllocationPayload),
+)
 
-    failed_records = []
 
-    # Mandatory fields check if those are null or not
-    _error = []
-    for field in FIELD_MANDATORY:
-        if row.get(field) is None:
-            _error.append(f"[FieldNotFound] : `{field}` ")
+def _raw_payloads(row, ctx: JobContext) -> tuple[list, dict]:
 
-    record = {}
-    for field, transform in FIELD_MAP.items():
-        value = row.get(field)
-        try:
-            record[field] = transform(value)
-        except Exception:
-            record[field] = None
+    """Resolve the remaining ids of a cleaned row of the job `ctx` and build its
+    unvalidated payloads for the three target tables.
+    Returns (errors, {table: payload}), payloads empty when the row already failed."""
 
-    empId = record['emp_id']
-    designation = record['new_hierarchical_designation']
-    qualification = record['scale_considered']
-    salary_slab = record['final_slab_considered']
+    reference = ctx.reference
+    _error = []
 
-    if qualification not in uniqueQualificationsInDB:
-        qualification = QUALIFICATION_MAPP.get(qualification, qualification)
+    # Already cleaned and checked for mandatory fields by `clean_and_validate`
+    record = dict(row)
 
-    if designation not in df_designationMapping.keys():
-        designation = DESIGNATION_MAPP.get(designation,designation)
+    empId = record['emp_id']
 
-    _designation_id = df_designationMapping.get(designation)
-    if _designation_id is None: _error.append(f"[designationIdError] : Designation id not found corresponding to designation `{designation}` ")
+    # Ids resolved for the whole upload by `resolve_slab_ids`
+    _designation_id = row['_designation_id']
+    qualificationSlabId = row['_qualification_slab_id']
+    workExSlabId = row['_work_ex_slab_id']
 
     if record['sub_designation']:
-        _sub_designation_id = df_subDesignationsMapping.get(record['sub_designation'], None)
+        _sub_designation_id = reference.subDesignationsMapping.get(record['sub_designation'], None)
     else:
         _sub_designation_id = None
 
     if not record['last_name']: record['last_name'] = ''
     if not record['remarks_salary_allocation']: record['remarks_salary_allocation'] = ''
 
-    try:
-        qualificationSlabId = (
-                    df_qualification
-                    .filter(
-                        (pl.col("slab_name") == qualification) &
-                        (pl.col("fk_designation_id") == _designation_id)
-                    )
-                    .select("id")
-                    .to_series()[0]
-        )
-    except Exception as e:
-        qualificationSlabId = None
-        _error.append(f'[qualificationSlabIdError] : No id found corresponding to qualification `{qualification}` & designationId `{_designation_id}` -> {e}')
-    
-    try :
-        workExSlabId = (
-                    df_workExSlab
-                    .filter(
-                        (pl.col("grade") == salary_slab) &
-                        (pl.col("fk_designation_id") == _designation_id) &
-                        (pl.col("fk_qualification_slab") == qualificationSlabId)
-                    )
-                    .select("id")
-                    .to_series()[0]
-        )
-    except Exception as e:
-        workExSlabId = None
-        _error.append(f'[workExSlabIdError] : No id found corresponding to grade `{salary_slab}`,fk_designation_id `{_designation_id}` & fk_qualification_slab `{qualificationSlabId}` -> {e}')
-
-    try:
-        nationalHeadEmpId = (
-                    df_employees
-                    .filter(
-                        pl.col("emp_uuid") == str(record['national_head_emp_id'])
-                    )
-                    .select("emp_id")
-                    .to_series()[0]
-        )
-    except Exception as e:
-        nationalHeadEmpId = None
-        _error.append(f"[nationalHeadEmpIdError] : No id found corresponding to emp_id `{record['national_head_emp_id']}` -> {e}")
+    nationalHeadEmpId = ctx.employee_index.get(record['national_head_emp_id'])
+    if nationalHeadEmpId is None:
+        _error.append(f"[nationalHeadEmpIdError] : No id found corresponding to emp_id `{record['national_head_emp_id']}`")
 
-    try:
-        countryHeadEmpId = (
-                    df_employees
-                    .filter(
-                        pl.col("emp_uuid") == str(record['country_head_emp_id'])
-                    )
-                    .select("emp_id")
-                    .to_series()[0]
-        )
-    except Exception as e:
-        countryHeadEmpId = None
-        _error.append(f"[countryHeadEmpIdError] : No id found corresponding to emp_id `{record['country_head_emp_id']}` -> {e}")
+    countryHeadEmpId = ctx.employee_index.get(record['country_head_emp_id'])
+    if countryHeadEmpId is None:
+        _error.append(f"[countryHeadEmpIdError] : No id found corresponding to emp_id `{record['country_head_emp_id']}`")
 
     # First CheckPoint of errors for a record
     if _error:
-        row.update({'Error': ';\n'.join(_error)})
-        failed_records.append(row)
-        return False, failed_records
+        return _error, {}
 
-    # --------------------- DB INSERTIONS ----------------------
+    # ------------------------ PAYLOADS ------------------------
     
     # --------- mmt_employees ---------
     payload_mmt_Employees = {
@@ -192,70 +166,51 @@ def process_record(row) -> tuple[bool, list]:
             'modified_by': MODIFIED_BY_ZERO_DEFAULT
     }
 
-    # ---------------------------------
-    # ----------------------------------------------------------
-
-    try:
-        record_mmt_employees = MMTEmployeePayload(**payload_mmt_Employees)
-    except Exception as e:
-        print(f"❌ Error in MMTEmployeePayload creation: {e}")
-        _error.append(f'[ValidationError] : Error in MMTEmployeePayload creation : {e} ')
+    # --- emp_onboarded_companyinfo ---
 
-    db_record_mmt_employees = record_mmt_employees.model_dump(exclude_none=True)
-    
     try:
-        emp_id_DB = insert_into_db(
-                    pl.DataFrame([db_record_mmt_employees]),
-                    EMPLOYEES_PERSONAL_DETAILS,
-                    *DB_CRED,
-                )
-        print(f"✅ Inserted employee ID: {emp_id_DB}")
+        payload_emp_onboarded_companyinfo = {
+                'depart_type': DEPARTMENT_TYPE_DEFAULT,                     # enum
+                'month_of_joining': (datetime.strptime(record['DOJ'], "%d-%b-%y") if "-" in record['DOJ'] and record['DOJ'][2].isalpha() else datetime.strptime(record['DOJ'], "%Y-%m-%d")).strftime("%B"),
+                'date_of_joining': record['DOJ'],
+                'is_weekend_off': IS_WEEKEND_OFF_DEFAULT,               # 'yes' / 'no'
+                'working_week_days_allocated': WORKING_WEEK_DAYS_ALLOCATED_DEFAULT,  # default = 5 if omitted
+                'fiscal_year': FISCAL_YEAR_DEFAULT,
+                'daily_wage': DAILY_WAGE_DEFAULT,
+                'is_permanent': IS_PERMANENT_DEFAULT,                   # tinyint(1)
+                'employeebility_type': EMPLOYEEBILITY_TYPE_DEFAULT,     # enum
+                'company_working_days': COMPANY_WORKING_DAYS_DEFAULT,   # default = 30 if omitted
+                'eligible_perks': ELIGIBLE_PERKS_DEFAULT,               # default = 1 if omitted
+                'basic_salary': BASIC_SALARY_DEFAULT,
+                'mapped_salary_default_fields': MAPPED_SALARY_DEFAULT_FIELDS_DEFAULT,
+
+                'created_by': CREATED_BY_NONE_DEFAULT,
+                'modified_by': MODIFIED_BY_NONE_DEFAULT,
+
+                'fk_region_id': reference.regionsMapping.get(record['region']) if record['region'] else None,
+                'fk_location_id': reference.locationsMapping.get(record['location']) if record['location'] else None,
+                'fk_branch_id': reference.branchMapping.get(record['branch']) if record['branch'] else None,
+                'fk_department_id': reference.deptMapping.get(record['department']) if record['department'] else None,
+                'fk_promoted_design_id': PROMOTED_DESIGNATION_ID_DEFAULT,
+                'fk_current_design_id': _designation_id,
+                'fk_country_head_emp': countryHeadEmpId,
+                'fk_national_head_emp': nationalHeadEmpId,
+                'fk_functional_role_id': reference.funcRolesMapping.get(record['new_functional_role']) if record['new_functional_role'] else None,
+                'fk_zone_id': reference.zonesMapping.get(record['zone']) if record['zone'] else None,
+                'fk_incentive_role_id': workExSlabId,
+
+                'is_trainee': record['is_trainee'],                       # default = 0 if omitted
+                'remarks': record['remarks_onboarding'],
+                'is_additional_sa': record['is_additional_sa'],           # default = 0
+                'is_super_annuation': record['is_super_annuation'],       # default = 0
+                'annual_bonus': record['annual_bonus'],
+                'adhoc_allowance': record['adhoc_allowance'],             # default = 0
+                'adhoc_type': record['adhoc_type']                        # enum('Default','Manual')
+                }
     except Exception as e:
-        print(f"❌ Insertion into `{EMPLOYEES_PERSONAL_DETAILS}` failed: {e}")
-        _error.append(f'[DBInsertionError] : Insertion into `{EMPLOYEES_PERSONAL_DETAILS}` failed : {e} ')
-
-    # --- emp_onboarded_companyinfo ---
+        payload_emp_onboarded_companyinfo = None
+        _error.append(f'[ValidationError] : Validation failed for {ONBOARDED_COMPANYINFO} : {e} ')
 
-    payload_emp_onboarded_companyinfo = {
-            'depart_type': DEPARTMENT_TYPE_DEFAULT,                     # enum
-            'month_of_joining': (datetime.strptime(record['DOJ'], "%d-%b-%y") if "-" in record['DOJ'] and record['DOJ'][2].isalpha() else datetime.strptime(record['DOJ'], "%Y-%m-%d")).strftime("%B"),
-            'date_of_joining': record['DOJ'],
-            'is_weekend_off': IS_WEEKEND_OFF_DEFAULT,               # 'yes' / 'no'
-            'working_week_days_allocated': WORKING_WEEK_DAYS_ALLOCATED_DEFAULT,  # default = 5 if omitted
-            'fiscal_year': FISCAL_YEAR_DEFAULT,
-            'daily_wage': DAILY_WAGE_DEFAULT,
-            'is_permanent': IS_PERMANENT_DEFAULT,                   # tinyint(1)
-            'employeebility_type': EMPLOYEEBILITY_TYPE_DEFAULT,     # enum
-            'company_working_days': COMPANY_WORKING_DAYS_DEFAULT,   # default = 30 if omitted
-            'eligible_perks': ELIGIBLE_PERKS_DEFAULT,               # default = 1 if omitted
-            'basic_salary': BASIC_SALARY_DEFAULT,
-            'mapped_salary_default_fields': MAPPED_SALARY_DEFAULT_FIELDS_DEFAULT,
-
-            'created_by': CREATED_BY_NONE_DEFAULT,
-            'modified_by': MODIFIED_BY_NONE_DEFAULT,
-
-            'fk_emp_id': emp_id_DB,
-            'fk_region_id': df_regionsMapping.get(record['region']) if record['region'] else None,
-            'fk_location_id': df_locationsMapping.get(record['location']) if record['location'] else None,
-            'fk_branch_id': df_branchMapping.get(record['branch']) if record['branch'] else None,
-            'fk_department_id': df_deptMapping.get(record['department']) if record['department'] else None,
-            'fk_promoted_design_id': PROMOTED_DESIGNATION_ID_DEFAULT,
-            'fk_current_design_id': _designation_id,
-            'fk_country_head_emp': countryHeadEmpId,
-            'fk_national_head_emp': nationalHeadEmpId,
-            'fk_functional_role_id': df_funcRolesMapping.get(record['new_functional_role']) if record['new_functional_role'] else None,
-            'fk_zone_id': df_zonesMapping.get(record['zone']) if record['zone'] else None,
-            'fk_incentive_role_id': workExSlabId,
-
-            'is_trainee': record['is_trainee'],                       # default = 0 if omitted
-            'remarks': record['remarks_onboarding'],
-            'is_additional_sa': record['is_additional_sa'],           # default = 0
-            'is_super_annuation': record['is_super_annuation'],       # default = 0
-            'annual_bonus': record['annual_bonus'],
-            'adhoc_allowance': record['adhoc_allowance'],             # default = 0
-            'adhoc_type': record['adhoc_type']                        # enum('Default','Manual')
-            }
-    
     # ---------------------------------
     # ---- mmt_salary_allocations -----
 
@@ -269,7 +224,6 @@ def process_record(row) -> tuple[bool, list]:
             # ================== OPTIONAL FIELDS ==================
 
             # ---------- Foreign Keys ----------
-            'fk_emp_id': emp_id_DB,                    # bigint – employee id
             'fk_qualification_slab_id': qualificationSlabId,     # bigint
             'work_ex_slab_id': workExSlabId,              # bigint
             'fk_sub_designation': _sub_designation_id,           # bigint
@@ -281,305 +235,597 @@ def process_record(row) -> tuple[bool, list]:
 
     # ---------------------------------
 
+    payloads = {
+        EMPLOYEES_PERSONAL_DETAILS: payload_mmt_Employees,
+        ONBOARDED_COMPANYINFO: payload_emp_onboarded_companyinfo,
+        EMPLOYEES_SALARY_ALLOCATIONS: payload_mmt_salary_allocations,
+    }
+    return _error, {table: payload for table, payload in payloads.items() if payload is not None}
+
+
+def build_payloads_batch(rows: list, ctx: JobContext) -> list[tuple[list, dict]]:
+
+    """Resolve the remaining ids of a batch of cleaned rows of the job `ctx` and validate
+    their payloads for the three target tables, one `validate_batch` call per table.
+    No DB writes happen here. `fk_emp_id` is left out, it is only known once `mmt_employees` is written.
+    Returns one (errors, {table: model_dump(exclude_none=True)}) per row, payloads empty on errors."""
+
+    built = [_raw_payloads(row, ctx) for row in rows]
+
+    # First CheckPoint rows are not validated further
+    pending = [i for i, (_error, payloads) in enumerate(built) if payloads]
+
     # Validations before DB Insertions
-    try:
-        record_emp_onboarded_companyinfo = EmployeeOnboardingCreate(**payload_emp_onboarded_companyinfo)
-    except Exception as e:
-        print(f"❌ mmt_employee updated but Validation failed for {ONBOARDED_COMPANYINFO}: {e}")
-        _error.append(f'[ValidationError] : mmt_employee updated but Validation failed for {ONBOARDED_COMPANYINFO} : {e} ')
+    validated = {i: {} for i in pending}
+    for table, model in PAYLOAD_MODELS:
+        idx = [i for i in pending if table in built[i][1]]
+        valid, errors = validate_batch(model, [built[i][1][table] for i in idx])
+
+        for k, dump in valid.items():
+            validated[idx[k]][table] = dump
+        for k, e in errors.items():
+            print(f"❌ Validation failed for {table}: {e}")
+            built[idx[k]][0].append(f'[ValidationError] : Validation failed for {table} : {e} ')
+
+    return [
+        (_error, {}) if _error or i not in validated else (_error, validated[i])
+        for i, (_error, _) in enumerate(built)
+    ]
 
+
+def build_payloads(row, ctx: JobContext) -> tuple[list, dict]:
+    """Single-row `build_payloads_batch`."""
+    return build_payloads_batch([row], ctx)[0]
+
+
+def _checkpoint(rows: list, ctx: JobContext) -> tuple | None:
+    """(job_id, upload row indices) for the writers, None when the job keeps no checkpoints."""
+    if not ctx.checkpoints:
+        return None
+    return ctx.job_id, [row[ROW_INDEX_COLUMN] for row in rows]
+
+
+def _failed(row, errors: list) -> tuple[bool, list]:
+    row.update({'Error': ';\n'.join(errors)})
+    return False, [row]
+
+
+def process_record(row, ctx: JobContext) -> tuple[bool, list]:
+
+    """Process a single record of the job `ctx` and insert into DB.
+    Returns a list of failed records (empty if successful)."""
+
+    _error, payloads = build_payloads(row, ctx)
+    if _error:
+        return _failed(row, _error)
+
+    # --------------------- DB INSERTIONS ----------------------
+
+    # Insertion into mmt_employees
     try:
-        record_mmt_salary_allocations = MMTSalaryAllocationPayload(**payload_mmt_salary_allocations)
+        emp_id_DB = insert_many_into_db(
+                    [payloads[EMPLOYEES_PERSONAL_DETAILS]],
+                    EMPLOYEES_PERSONAL_DETAILS,
+                    *ctx.db_cred,
+                )[0]
+        ctx.employee_index.add(row['emp_id'], emp_id_DB)
+        print(f"✅ Inserted employee ID: {emp_id_DB}")
     except Exception as e:
-        print(f"❌ mmt_employee updated but Validation failed for {EMPLOYEES_SALARY_ALLOCATIONS}: {e}")
-        _error.append(f'[ValidationError] : mmt_employee updated but Validation failed for {EMPLOYEES_SALARY_ALLOCATIONS} : {e} ')
+        print(f"❌ Insertion into `{EMPLOYEES_PERSONAL_DETAILS}` failed: {e}")
+        return _failed(row, [f'[DBInsertionError] : Insertion into `{EMPLOYEES_PERSONAL_DETAILS}` failed : {e} '])
 
+    # Insertion into emp_onboarded_companyinfo and mmt_salary_allocations
+    for table in (ONBOARDED_COMPANYINFO, EMPLOYEES_SALARY_ALLOCATIONS):
+        try:
+            new_id = insert_many_into_db(
+                        [{**payloads[table], 'fk_emp_id': emp_id_DB}],
+                        table,
+                        *ctx.db_cred,
+            )[0]
+            print(f"✅ Inserted `{table}` ID: {new_id}")
+        except Exception as e:
+            print(f"❌ Insertion into `{table}` failed: {e}")
+            _error.append(f'[DBInsertionError] : Insertion into `{table}` failed : {e} ')
+
+    # Error Check Point 2
+    if _error:
+        return _failed(row, _error)
+
+    # Row by row the checkpoint commits on its own, right after the dependents
+    if ctx.checkpoints:
+        try:
+            insert_job_checkpoints(ctx.job_id, [row[ROW_INDEX_COLUMN]], [emp_id_DB], *ctx.db_cred)
+        except Exception as e:
+            print(f"[Warning] : Checkpoint of emp_id `{emp_id_DB}` failed due to `{e}`")
+
+    return True, []
+
+
+def process_rows(rows: list, ctx: JobContext) -> list[tuple[bool, list]]:
+    """Process a batch of records of the job `ctx` one by one through `process_record`."""
+    return [process_record(row, ctx) for row in rows]
 
-    # Insertion into emp_onboarded_companyinfo
 
-    db_record_emp_onboarded_companyinfo = record_emp_onboarded_companyinfo.model_dump(exclude_none=True)
+def process_rows_transactional(rows: list, ctx: JobContext) -> list[tuple[bool, list]]:
 
+    """Insert a batch of records of the job `ctx`, one commit for the whole batch across the three tables.
+    The batch is first written in three statements by `write_employees_bulk`; when that fails it is
+    written again by `write_employees_transactional`, one savepoint per employee, to isolate the bad rows.
+    Returns one (success, failed records) per row, like `process_record`."""
+
+    results = [None] * len(rows)
+    written = []
+    payloads = []
+
+    for i, (row, (_error, row_payloads)) in enumerate(zip(rows, build_payloads_batch(rows, ctx))):
+        if _error:
+            results[i] = _failed(row, _error)
+        else:
+            written.append(i)
+            payloads.append(row_payloads)
+
+    if not payloads:
+        return results
+
+    checkpoint = _checkpoint([rows[i] for i in written], ctx)
     try:
-        emp_onboarded_id_DB = insert_into_db(
-                    pl.DataFrame([db_record_emp_onboarded_companyinfo]),
-                    ONBOARDED_COMPANYINFO,
-                    *DB_CRED,
-                )
-        print(f"✅ Inserted employee onboarded company info ID: {emp_onboarded_id_DB}")
-    except Exception as e:
-        print(f"❌ Insertion into {ONBOARDED_COMPANYINFO} failed: {e}")
-        _error.append(f'[DBInsertionError] : Insertion into {ONBOARDED_COMPANYINFO} failed : {e} ')
+        new_ids = write_employees_bulk(payloads, *ctx.db_cred, checkpoint=checkpoint)
+        outcomes = [(new_ids[str(payload[EMPLOYEES_PERSONAL_DETAILS]['emp_uuid'])], None) for payload in payloads]
+    except RuntimeError as e:
+        print(f"[Warning] : {e}, retrying {len(payloads)} records with one savepoint each.")
+        try:
+            outcomes = write_employees_transactional(payloads, *ctx.db_cred, checkpoint=checkpoint)
+        except (RuntimeError, TimeoutError) as e:
+            print(f"❌ {e}")
+            outcomes = [(None, f'[DBInsertionError] : {e} ')] * len(payloads)
+    except TimeoutError as e:
+        # no pooled connection came free, the batch fails instead of the job
+        print(f"❌ {e}")
+        outcomes = [(None, f'[DBInsertionError] : {e} ')] * len(payloads)
+
+    for i, (emp_id, error) in zip(written, outcomes):
+        if error:
+            print(f"❌ {error}")
+            results[i] = _failed(rows[i], [error])
+        else:
+            ctx.employee_index.add(rows[i]['emp_id'], emp_id)
+            results[i] = (True, [])
+
+    print(f"✅ Inserted {len(payloads) - sum(1 for _, error in outcomes if error)} employees in one transaction")
+    return results
+
+
+def validate_rows(rows: list, ctx: JobContext) -> list[tuple[bool, list]]:
+
+    """Dry-run counterpart of `process_rows_transactional`: resolve and validate a batch of
+    records of the job `ctx` without writing to DB. Valid rows go into the employee index
+    with a placeholder id, so reports in later hierarchy waves still find their heads.
+    Returns one (success, failed records) per row, like `process_record`."""
+
+    results = []
+    for row, (_error, _) in zip(rows, build_payloads_batch(rows, ctx)):
+        if _error:
+            results.append(_failed(row, _error))
+        else:
+            ctx.employee_index.add(row['emp_id'], DRY_RUN_EMP_ID)
+            results.append((True, []))
+    return results
+
+
+def sync_rows(rows: list, ctx: JobContext) -> list[tuple[bool, list]]:
+
+    """Sync a batch of records of the job `ctx` whose emp_id is already in DB through
+    `sync_employees`: only the rows that changed are written, in one transaction unless a
+    row makes it fail, the batch is then split by `_sync_isolating` to fail that row alone.
+    Returns one (success, failed records) per row, like `process_record`."""
+
+    results = [None] * len(rows)
+    synced = []
+    payloads = []
+
+    for i, (row, (_error, row_payloads)) in enumerate(zip(rows, build_payloads_batch(rows, ctx))):
+        if _error:
+            results[i] = _failed(row, _error)
+        else:
+            synced.append(i)
+            payloads.append(row_payloads)
+
+    if not payloads:
+        return results
+
+    outcomes = _sync_isolating(payloads, [ctx.employee_index.get(rows[i]['emp_id']) for i in synced], ctx.db_cred)
+
+    for i, (written, error) in zip(synced, outcomes):
+        if error:
+            print(f"❌ {error}")
+            results[i] = _failed(rows[i], [error])
+        else:
+            results[i] = (True, [])
+
+    changed = [written for written, error in outcomes if not error]
+    ctx.record_sync(updated=sum(changed), unchanged=len(changed) - sum(changed))
+    print(f"✅ Synced {len(changed)} existing employees, {sum(changed)} changed")
+    return results
+
+
+def _sync_isolating(payloads: list, emp_ids: list, db_cred: tuple) -> list:
+    """`sync_employees` on a batch; when its transaction fails the batch is split in halves
+    and retried until the bad rows stand alone. Returns one (written, error) per payload."""
+
+    try:
+        return [(written, None) for written in sync_employees(payloads, emp_ids, *db_cred)]
+    except TimeoutError as e:
+        # no pooled connection came free, splitting would only wait again
+        return [(False, f'[DBSyncError] : {e} ')] * len(payloads)
+    except RuntimeError as e:
+        if len(payloads) == 1:
+            return [(False, f'[DBSyncError] : {e} ')]
+        print(f"[Warning] : {e}, retrying {len(payloads)} records in halves.")
+
+    mid = len(payloads) // 2
+    return (
+        _sync_isolating(payloads[:mid], emp_ids[:mid], db_cred)
+        + _sync_isolating(payloads[mid:], emp_ids[mid:], db_cred)
+    )
 
-    # Insertion into mmt_salary_allocations
 
-    
-    db_record_mmt_salary_allocations = record_mmt_salary_allocations.model_dump(exclude_none=True)
-    
+def process_chunk_staged(df: pl.DataFrame, ctx: JobContext) -> tuple[list, list]:
+
+    """Insert a prepared chunk through `stage_and_load`, all rows in one transaction.
+    Returns (failed records, rows to retry one by one when the set-based load failed)."""
+
+    failed_records = []
+    staged_rows = []
+    payloads = []
+
+    rows = df.to_dicts()
+    for row, (_error, row_payloads) in zip(rows, build_payloads_batch(rows, ctx)):
+        if _error:
+            failed_records.extend(_failed(row, _error)[1])
+        else:
+            staged_rows.append(row)
+            payloads.append(row_payloads)
+
+    if not payloads:
+        return failed_records, []
+
     try:
-        emp_salary_allo_id = insert_into_db(
-                    pl.DataFrame([db_record_mmt_salary_allocations]),
-                    EMPLOYEES_SALARY_ALLOCATIONS,
-                    *DB_CRED,
+        new_ids = stage_and_load(payloads, *ctx.db_cred, checkpoint=_checkpoint(staged_rows, ctx))
+    except (RuntimeError, TimeoutError) as e:
+        print(f"[Warning] : {e}, retrying {len(staged_rows)} records row by row.")
+        return failed_records, staged_rows
+
+    for emp_uuid, emp_id in new_ids.items():
+        ctx.employee_index.add(emp_uuid, emp_id)
+    print(f"✅ Inserted {len(new_ids)} employees through staging tables")
+
+    return failed_records, []
+
+
+def _find_existing_keys(df: pl.DataFrame, ctx: JobContext) -> dict:
+    """`DEDUP_KEYS` values of a cleaned chunk that `mmt_employees` already holds.
+    emp_ids are checked against the job's employee index, the other keys with batched `IN (...)` queries."""
+
+    existing = {}
+    for field, values in dedup_values(df).items():
+        if field == 'emp_id':
+            existing[field] = [value for value in values if value in ctx.employee_index]
+        else:
+            existing[field] = fetch_existing_values(
+                EMPLOYEES_PERSONAL_DETAILS,
+                DEDUP_KEYS[field],
+                values,
+                *ctx.db_cred
+            )
+    return existing
+
+
+def _find_key_owners(df: pl.DataFrame, ctx: JobContext) -> dict:
+    """{value: emp_uuid holding it} of the unique keys other than emp_id, for the sync rows of a chunk.
+    A sync row may keep its own email and mobile_no but not take another employee's."""
+
+    return {
+        field: fetch_value_owners(
+            EMPLOYEES_PERSONAL_DETAILS,
+            DEDUP_KEYS[field],
+            DEDUP_KEYS['emp_id'],
+            values,
+            *ctx.db_cred
         )
-        print(f"✅ Inserted employee salary allocation ID: {emp_salary_allo_id}")
-    except Exception as e:
-        print(f"❌ Insertion into `{EMPLOYEES_SALARY_ALLOCATIONS}` failed: {e}")
-        _error.append(f'[DBInsertionError] : Insertion into `{EMPLOYEES_SALARY_ALLOCATIONS}` failed : {e} ')
-    
-    # Error Check Point 2
-    if _error:
-        row.update({'Error': _error})
-        failed_records.append(row)
-        return False, failed_records 
+        for field, values in dedup_values(df).items()
+        if field != 'emp_id'
+    }
+
+
+def _prepare_chunk(df: pl.DataFrame, ctx: JobContext, sync: bool = False) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Clean, validate, de-duplicate and resolve the ids of a chunk of the upload.
+    With `sync` rows of employees already in DB are marked in `SYNC_UPDATE_COLUMN`.
+    Returns (rows ready for insertion, failed rows with their `Error`)."""
 
-    return True, failed_records
+    reference = ctx.reference
 
+    # ---------------- CLEAN & VALIDATE ----------------
+    df = clean_and_validate(df)
+
+    # ---------------- RESOLVE SLAB IDS ----------------
+    df = resolve_slab_ids(
+        df,
+        reference.designationMapping,
+        reference.df_qualification,
+        reference.df_workExSlab,
+        reference.uniqueQualificationsInDB
+    )
 
-def process_excel(file_path: str, job_id: str) -> tuple[bool, pl.DataFrame]:
+    # ---------------- DUPLICATES ----------------
+    if sync:
+        df = df.with_columns(
+            pl.Series(SYNC_UPDATE_COLUMN, ctx.employee_index.contains_many(df['emp_id'].to_list()), dtype=pl.Boolean)
+        )
+        df = flag_duplicates(
+            df,
+            _find_existing_keys(df.filter(~pl.col(SYNC_UPDATE_COLUMN)), ctx),
+            _find_key_owners(df.filter(pl.col(SYNC_UPDATE_COLUMN)), ctx)
+        )
+    else:
+        df = flag_duplicates(df, _find_existing_keys(df, ctx))
+
+    return split_failed(df)
+
+
+def process_excel(
+    file_path: str,
+    job_id: str,
+    df: pl.DataFrame | None = None,
+    db_cred: tuple = DB_CRED,
+    stream: bool = False,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    file_format: str | None = None,
+    engine: str = 'auto',
+    dry_run: bool = False,
+    resume: bool = False,
+    mode: str = 'insert',
+    metrics: dict | None = None
+) -> tuple[bool, pl.DataFrame]:
     """
     Main callable function for FastAPI
+    Accepts Excel, CSV, Parquet and Arrow IPC files, `file_format` is detected when omitted.
+    Pass `df` when the file is already parsed, `file_path` is then not read again.
+    With `stream` the file is read, validated and inserted `chunk_size` rows at a time.
+    `engine` picks the insert path: 'rows' (threaded, row by row), 'transactional' (threaded,
+    TRANSACTION_CHUNK_SIZE employees per transaction), 'staging' (set-based through staging
+    tables) or 'auto' (staging for chunks of at least STAGING_MIN_ROWS rows, transactional otherwise).
+    Each chunk is inserted in hierarchy waves, heads named in the chunk go in before their reports.
+    With `dry_run` every check runs, ids and heads included, but nothing is written to DB,
+    `job_id` then only labels the run and needs no job row.
+    Committed rows are checkpointed by their position in the file. With `resume` the rows
+    `job_id` already committed are skipped, the file must be the one originally uploaded.
+    `mode` 'sync' inserts new employees as usual and diffs the ones already in DB by emp_uuid,
+    writing only the changed rows of the three tables with bulk upserts ('insert' rejects them).
+    Pass a `metrics` dict to get the elapsed time of the processing phase (after the preloads and,
+    unless streamed, the file read), counters, pool stats and the latency of every
+    batch (dispatch to commit in the worker, seconds, a staged wave counts as one batch) filled in.
     Returns: (success: bool, failed_df: pl.DataFrame | None)
     """
 
+    # Arguments are checked before anything touches DB, a bad one must not leave the job half restarted
+    if engine not in ('auto', 'rows', 'transactional', 'staging'):
+        raise ValueError(f"Unknown engine `{engine}`, expected 'auto', 'rows', 'transactional' or 'staging'")
+
+    if mode not in ('insert', 'sync'):
+        raise ValueError(f"Unknown mode `{mode}`, expected 'insert' or 'sync'")
+    sync = mode == 'sync'
+
     # ------------------------------------------------------------
     # --------------------- PRELOAD DB DATA ----------------------
     # ------------------------------------------------------------
 
-    # Sub-Designations
-    df_subDesignations = fetch_from_db(
-        SUB_DESIGNATIONS,
-        *DB_CRED
-    )
-    df_subDesignations = df_subDesignations.select([
-        'id',
-        'name'
-    ])
-    # uniqueSubDesignations = list(df_subDesignations['name'].unique())
-    global df_subDesignationsMapping
-    df_subDesignationsMapping = dict(zip(
-        df_subDesignations['name'].to_list(),
-        df_subDesignations['id'].to_list()
-    ))
-
-    # Regions
-    df_regions = fetch_from_db(
-        REGION,
-        *DB_CRED
-    )
-    df_regions = df_regions.select([
-        'id',
-        'rg_name'
-    ])
-    uniqueRegions = list(df_regions['rg_name'].unique())
-
-    global df_regionsMapping
-    df_regionsMapping = dict(zip(
-        df_regions['rg_name'].to_list(),
-        df_regions['id'].to_list()
-    ))
-
-    # Branches
-    df_branch = fetch_from_db(
-        BRANCH,
-        *DB_CRED
-    )
-    df_branch = df_branch.select([
-        'branch_id',
-        'branch_name'
-    ])
-    uniqueBranches = list(df_branch['branch_name'].unique())
-
-    global df_branchMapping
-    df_branchMapping = dict(zip(
-        df_branch['branch_name'].to_list(),
-        df_branch['branch_id'].to_list()
-    ))
-
-    # Locations
-    df_locations = fetch_from_db(
-        LOCATION,
-        *DB_CRED
-    )
-    df_locations = df_locations.select([
-        'location_id',
-        'location_name'
-    ])
-    uniqueLocations = list(df_locations['location_name'].unique())
-
-    global df_locationsMapping
-    df_locationsMapping = dict(zip(
-        df_locations['location_name'].to_list(),
-        df_locations['location_id'].to_list()
-    ))
-
-    # Zones
-    df_zones = fetch_from_db(
-        ZONE_MASTER,
-        *DB_CRED
-    )
-    df_zones = df_zones.select([
-        'id',
-        'rg_name'
-    ])
-    uniqueZones = list(df_zones['rg_name'].unique())
-
-    global df_zonesMapping
-    df_zonesMapping = dict(zip(
-        df_zones['rg_name'].to_list(),
-        df_zones['id'].to_list()
-    ))
-
-    # Departments
-    df_departments = fetch_from_db(
-        DEPARTMENT,
-        *DB_CRED
-    )
-    df_departments = df_departments.select([
-        'dept_id',
-        'dept_name'
-    ])  
-    uniqueDepartments = list(df_departments['dept_name'].unique())
-
-    global df_deptMapping
-    df_deptMapping = dict(zip(
-        df_departments['dept_name'].to_list(),
-        df_departments['dept_id'].to_list()
-    ))
-
-    # Functional Roles
-    global df_functionalRoles
-    df_functionalRoles = fetch_from_db(
-        FUNCTIONAL_ROLES,
-        *DB_CRED   
-    )
-    df_functionalRoles = df_functionalRoles.select([ 
-        'id',
-        'role_name'
-    ])
-    uniqueFunctionalRoles = list(df_functionalRoles['role_name'].unique())
-
-    global df_funcRolesMapping
-    df_funcRolesMapping = dict(zip(
-        df_functionalRoles['role_name'].to_list(),
-        df_functionalRoles['id'].to_list()
-    ))
-
-    # Preload Qualification Slabs and WorkEx Slabs
-    global df_workExSlab
-    df_workExSlab = fetch_from_db(
-        SLAB_MASTER,
-        *DB_CRED
-    )
-
-    global df_qualification
-    df_qualification = fetch_from_db(
-        QUALIFICATION,
-        *DB_CRED
-    )
-    df_qualification = df_qualification.select(
-        "id", "slab_name", "fk_designation_id"
-    )
-    df_qualification = df_qualification.with_columns(
-        pl.col("slab_name")
-        .cast(pl.Utf8)
-        .str.replace_all(r"^\s+|\s+$", "")   # strip using regex
-        # .str.to_uppercase()
+    # Per-job state: resolved reference data, employee index and counters
+    ctx = JobContext(
+        job_id=job_id,
+        db_cred=db_cred,
+        reference=load_reference_data(*db_cred),
+        employee_index=EmployeeIndex.load(*db_cred),
+        checkpoints=not dry_run
     )
 
-    # Designations
-    df_designation = fetch_from_db(
-        DG_DESIGNATIONS,
-        *DB_CRED
-    )
-    df_designation = df_designation['design_id','designation_name']
-    global df_designationMapping
-    df_designationMapping = dict(zip(
-        df_designation['designation_name'].to_list(),
-        df_designation['design_id'].to_list()
-    ))
+    # Rows committed by an earlier run of this job, row index -> emp_id
+    done_rows = {}
+    if not dry_run:
+        ensure_checkpoint_table(*db_cred)
+        if resume:
+            done_rows = fetch_job_checkpoints(job_id, *db_cred)
+            restart_job(job_id, len(done_rows), *db_cred)
+            print(f"[Info] Resuming job `{job_id}`, {len(done_rows)} records already committed.")
+
+    # Input: the frame the caller already parsed, a streamed file or a one-shot read
+    if df is not None:
+        chunks = [df]
+    else:
+        file_format = file_format or detect_format(file_path)
+        if stream:
+            chunks = iter_upload_chunks(file_path, file_format, chunk_size)
+        else:
+            chunks = [read_upload(file_path, file_format)]
+
+    # Threaded path: rows are submitted in batches, one transaction per batch unless 'rows'
+    if dry_run:
+        process_batch, batch_size = validate_rows, TRANSACTION_CHUNK_SIZE
+    elif engine == 'rows':
+        process_batch, batch_size = process_rows, 1
+    else:
+        process_batch, batch_size = process_rows_transactional, TRANSACTION_CHUNK_SIZE
 
-    # Read Excel
-    df = pl.read_excel(file_path)
+    # ---------------- PROCESS RECORDS ----------------
+    all_failed_records = []
+    batch_latencies = []    # seconds from dispatch to commit, one per batch
+    start = time.time()
 
-    uniqueQualificationsInFile = list(set(df['scale_considered'].unique().to_list()))
-    uniqueQualificationsInFile = [i.strip().upper() for i in uniqueQualificationsInFile]
-    uniqueQualificationsInFile.sort()
+    # Workers borrow connections from the shared pool, so it must cover every worker
+    db_pool = get_pool(*db_cred)
+    if db_pool.size < BATCH_WORKERS:
+        print(f'[Warning] DB pool size {db_pool.size} is smaller than {BATCH_WORKERS} workers, workers will wait for connections.')
 
-    global uniqueQualificationsInDB
-    uniqueQualificationsInDB = df_qualification['slab_name'].unique().to_list()
-    uniqueQualificationsInDB.sort()
+    print(f'[Info] Using {BATCH_WORKERS} workers.')
 
-    global uniqueGradeSlabsInDB
-    uniqueGradeSlabsInDB = df_workExSlab['grade'].unique().to_list()
-    uniqueGradeSlabsInDB.sort()
+    # Progress is written in the background, dry runs have no job row to update
+    reporter = None if dry_run else ProgressReporter(job_id, db_cred)
 
-    # ---------------- PROCESS RECORDS ----------------
-    all_failed_records = [] 
-    processed = 0
-    start = time.time()
+    def _progress(count: int) -> None:
+        if reporter is not None:
+            reporter.add(count)
 
-    print(f'[Info] Using {BATCH_WORKERS} workers.')
+    rows_in_flight = 0
 
     try:
+        def _collect(done) -> None:
+            nonlocal rows_in_flight
+            for future in done:
+                results = future.result()
+                rows_in_flight -= len(results)
+                for success, failed in results:
+                    ctx.record_result(success)
+
+                    if not success:
+                        all_failed_records.extend(failed)
+
+                # 🔹 coalesced by the reporter
+                _progress(len(results))
+
+        def _timed(task, rows, dispatched_at: float) -> list:
+            # Taken in the worker once the batch is committed, not when it is collected
+            results = task(rows, ctx)
+            batch_latencies.append(time.perf_counter() - dispatched_at)
+            return results
+
+        # Batches are streamed into the pool, at most MAX_IN_FLIGHT_ROWS rows at a time
         with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
-            futures = [
-                executor.submit(process_record, row)
-                for row in df.iter_rows(named=True)
-            ]
-
-            for future in as_completed(futures):
-                success, failed = future.result()
-
-                processed += 1
-
-                if not success:
-                    all_failed_records.extend(failed)
-
-                # 🔹 batch DB update
-                if processed % BATCH_UPDATE_SIZE == 0:
-                    update_job_progress(
-                        job_id,
-                        BATCH_UPDATE_SIZE,
-                        *DB_CRED
-                    )
-
-        # FLUSH remaining records ONCE (outside loop)
-        remaining = processed % BATCH_UPDATE_SIZE
-        if remaining:
-            update_job_progress(
-                job_id,
-                remaining,
-                *DB_CRED
-            )
-
-        # Mark job completed ONCE
-        mark_job_completed(job_id, *DB_CRED)
+            in_flight = set()
+
+            def _submit(task, rows, size: int) -> None:
+                nonlocal in_flight, rows_in_flight
+                max_rows = max(MAX_IN_FLIGHT_ROWS, BATCH_WORKERS * size)
+                rows = iter(rows)
+                while batch := list(islice(rows, size)):
+                    while in_flight and rows_in_flight + len(batch) > max_rows:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        _collect(done)
+
+                    in_flight.add(executor.submit(_timed, task, batch, time.perf_counter()))
+                    rows_in_flight += len(batch)
+
+            offset = 0
+            for chunk in chunks:
+                # Position in the file, stable across runs of the same upload
+                chunk = chunk.with_row_index(ROW_INDEX_COLUMN, offset=offset)
+                offset += chunk.height
+                if done_rows:
+                    chunk = chunk.filter(~pl.col(ROW_INDEX_COLUMN).is_in(list(done_rows)))
+
+                chunk, df_unresolved = _prepare_chunk(chunk, ctx, sync)
+                print(f"[Check] : Records failing cleaning/designation/slab/duplicate checks : {df_unresolved.height} of {chunk.height + df_unresolved.height}")
+
+                # Heads in the file are inserted a wave before their reports
+                waves, df_cyclic = hierarchy_waves(chunk)
+                print(f"[Info] Hierarchy waves : {[wave.height for wave in waves]}, records in head cycles : {df_cyclic.height}")
+
+                # Rows rejected before the insert phase count as processed too
+                for df_rejected in (df_unresolved, df_cyclic):
+                    if df_rejected.height:
+                        all_failed_records.extend(df_rejected.to_dicts())
+                        ctx.record_result(False, df_rejected.height)
+                        _progress(df_rejected.height)
+
+                staged = not dry_run and (engine == 'staging' or (engine == 'auto' and chunk.height >= STAGING_MIN_ROWS))
+
+                for wave in waves:
+                    # Employees already in DB only get their delta written
+                    if sync and not dry_run:
+                        _submit(sync_rows, wave.filter(pl.col(SYNC_UPDATE_COLUMN)).iter_rows(named=True), SYNC_CHUNK_SIZE)
+                        wave = wave.filter(~pl.col(SYNC_UPDATE_COLUMN))
+
+                    rows = wave.iter_rows(named=True)
+
+                    # Large chunks go set-based, rows it could not load fall back to the threaded path
+                    if staged:
+                        staged_at = time.perf_counter()
+                        failed, rows = process_chunk_staged(wave, ctx)
+                        batch_latencies.append(time.perf_counter() - staged_at)
+                        all_failed_records.extend(failed)
+                        ctx.record_result(False, len(failed))
+                        ctx.record_result(True, wave.height - len(failed) - len(rows))
+                        if wave.height - len(rows):
+                            _progress(wave.height - len(rows))
+
+                    _submit(process_batch, rows, batch_size)
+
+                    # The next wave resolves its heads from the employee index, the whole wave must be in
+                    _collect(as_completed(in_flight))
+                    in_flight = set()
+
+        # Remaining count, COMPLETED and the real total (streamed Excel jobs start from an estimate) in one write, ONCE
+        if reporter is not None:
+            reporter.close('COMPLETED', total_record=offset)
 
     except Exception as e:
-        mark_job_failed(job_id, *DB_CRED)
+        if reporter is not None:
+            reporter.close('FAILED')
         raise   # re-raise so API knows something went wrong
 
     end = time.time()
 
 
     print(f"Time taken: {end - start:.2f}s")
+    print(f"[Info] DB pool stats : {db_pool.stats()}")
     print("Total Records Failed:", len(all_failed_records))
+    print(f"[Info] Job `{job_id}` counters : {ctx.counters()}")
+
+    if metrics is not None:
+        metrics.update(
+            elapsed=end - start,
+            counters=ctx.counters(),
+            pool=db_pool.stats(),
+            batch_latencies=batch_latencies
+        )
 
     if not all_failed_records:
         return True, None
 
-    failed_df = pl.DataFrame(all_failed_records)
+    failed_df = pl.DataFrame(all_failed_records, infer_schema_length=None, strict=False).drop(RESOLVED_COLUMNS + [ROW_INDEX_COLUMN, SYNC_UPDATE_COLUMN], strict=False)
     return False, failed_df
 
 
 if __name__ == "__main__":
-        # File Paths
-    print("ok1")
-    FAILED_RECORDS = 'bulk_upload\failed_records.xlsx'
-    RECORDS = 'bulk_upload\Digikit_bulk_main_data_1.xlsx'
-    success, failed = process_excel(RECORDS)
+    import argparse
+    import uuid
+
+    from bulk_upload.db import create_job_entry
+    from bulk_upload.services.readers import count_upload_rows
+
+    parser = argparse.ArgumentParser(description="Run an upload file through process_excel.")
+    parser.add_argument("file", help="Excel, CSV, Parquet or Arrow IPC upload")
+    parser.add_argument("--failed", default="failed_records.xlsx", help="where the failed-records report is written")
+    parser.add_argument("--engine", default="auto", choices=("auto", "rows", "transactional", "staging"))
+    parser.add_argument("--mode", default="insert", choices=("insert", "sync"))
+    parser.add_argument("--dry-run", action="store_true", help="validate only, nothing is written to DB")
+    args = parser.parse_args()
+
+    job_id = f"cli-{uuid.uuid4()}"
+    file_format = detect_format(args.file)
+
+    # Real runs report progress against a job row like API uploads do
+    if not args.dry_run:
+        create_job_entry(job_id, count_upload_rows(args.file, file_format), args.file, *DB_CRED)
+
+    success, failed = process_excel(
+        args.file,
+        job_id,
+        file_format=file_format,
+        engine=args.engine,
+        mode=args.mode,
+        dry_run=args.dry_run
+    )
 
-    failed.write_excel(FAILED_RECORDS)
+    if not success:
+        failed.to_pandas().to_excel(args.failed, index=False)
+        print(f"[Info] Failed records written to `{args.failed}`")
     print(success)
-    print(failed)
-    # main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import polars as pl
+
+# Columns referencing the emp_id of another employee, resolved through the employee index
+HEAD_COLUMNS = ('national_head_emp_id', 'country_head_emp_id')
+
+
+def _id_text(column: pl.Series) -> list:
+    """Employee ids as stripped text, keyed like `EmployeeIndex`.
+    `emp_id` is text after cleaning while numeric head columns stay Int64."""
+    return column.cast(pl.Utf8).str.strip_chars().to_list()
+
+
+def hierarchy_waves(
+    df: pl.DataFrame,
+    head_columns: tuple = HEAD_COLUMNS,
+) -> tuple[list, pl.DataFrame]:
+    """Order the rows of an upload so that heads are inserted before their reports.
+
+    A row depends on the rows of the same frame whose `emp_id` it names in
+    `head_columns`. Rows are grouped into waves by topological order. Wave 0
+    holds rows without in-file heads, and each later wave only depends on
+    earlier ones. A row naming itself as head adds no dependency.
+
+    Returns (list of wave frames in insertion order, failed rows with an `Error`
+    column for rows caught in a head cycle or depending on one).
+    """
+
+    if df.is_empty():
+        return [], df.with_columns(pl.lit(None, pl.Utf8).alias('Error')).clear()
+
+    # emp_id -> row positions, duplicated ids make a report wait for every copy
+    positions = {}
+    for i, emp_id in enumerate(_id_text(df['emp_id'])):
+        positions.setdefault(emp_id, []).append(i)
+
+    heads = zip(*(_id_text(df[column]) for column in head_columns))
+    pending = {
+        i: {j for head in row_heads if head is not None for j in positions.get(head, ()) if j != i}
+        for i, row_heads in enumerate(heads)
+    }
+
+    wave_of = [None] * df.height
+    wave = 0
+    while pending:
+        ready = [i for i, deps in pending.items() if all(wave_of[j] is not None for j in deps)]
+        if not ready:
+            break
+        for i in ready:
+            wave_of[i] = wave
+            del pending[i]
+        wave += 1
+
+    df = df.with_columns(pl.Series('_wave', wave_of, dtype=pl.Int32))
+
+    waves = [
+        df.filter(pl.col('_wave') == w).drop('_wave')
+        for w in range(wave)
+    ]
+
+    df_cyclic = (
+        df.filter(pl.col('_wave').is_null())
+        .drop('_wave')
+        .with_columns(pl.lit("[HierarchyCycleError] : Head references in the file form a cycle").alias('Error'))
+    )
+
+    return waves, df_cyclic
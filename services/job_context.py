@@ -0,0 +1,57 @@
+import threading
+
+from dataclasses import dataclass, field
+from bulk_upload.config import DB_CRED
+from bulk_upload.services.employee_index import EmployeeIndex
+from bulk_upload.services.reference_data import ReferenceData
+
+# Position of a record in the upload, added by `process_excel` and used for job checkpoints
+ROW_INDEX_COLUMN = '_row'
+
+
+@dataclass
+class JobContext:
+    """Everything one upload job needs, passed explicitly to `process_record`
+    so several jobs can run in the same process without sharing state."""
+
+    job_id: str
+    reference: ReferenceData
+    employee_index: EmployeeIndex
+    db_cred: tuple = DB_CRED
+
+    # record committed upload rows in the checkpoint table, rows then carry `ROW_INDEX_COLUMN`
+    checkpoints: bool = False
+
+    # counters, updated through `record_result`
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+
+    # sync mode: existing employees rewritten / left as they were
+    updated: int = 0
+    unchanged: int = 0
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_result(self, success: bool, count: int = 1) -> None:
+        with self._lock:
+            self.processed += count
+            if success:
+                self.succeeded += count
+            else:
+                self.failed += count
+
+    def record_sync(self, updated: int, unchanged: int) -> None:
+        with self._lock:
+            self.updated += updated
+            self.unchanged += unchanged
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {
+                'processed': self.processed,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'updated': self.updated,
+                'unchanged': self.unchanged,
+            }
@@ -0,0 +1,136 @@
+import os
+import glob
+import shutil
+import threading
+import polars as pl
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from bulk_upload.config import (
+    JOB_WORKERS,
+    JOB_FILES_DIR
+)
+from bulk_upload.services.employee_processor import process_excel
+
+os.makedirs(JOB_FILES_DIR, exist_ok=True)
+
+# Bounded pool running every upload, DB_POOL_SIZE covers JOB_WORKERS jobs at a time
+_executor = ThreadPoolExecutor(
+    max_workers=JOB_WORKERS,
+    thread_name_prefix="upload-job"
+)
+
+# job_id -> state of jobs submitted to this process
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _update_job(job_id: str, **fields) -> None:
+    with _jobs_lock:
+        _jobs.setdefault(job_id, {}).update(fields)
+
+
+def retain_upload(temp_path: str, job_id: str, extension: str) -> str:
+    """Move a spooled upload next to the job files, it is kept until the job completes so it can be resumed."""
+    file_path = os.path.join(JOB_FILES_DIR, f"{job_id}_upload{extension}")
+    shutil.move(temp_path, file_path)
+    return file_path
+
+
+def find_upload(job_id: str) -> str | None:
+    """Retained upload of a job, None once the job completed or the file was cleaned up."""
+    matches = glob.glob(os.path.join(JOB_FILES_DIR, f"{glob.escape(job_id)}_upload.*"))
+    return matches[0] if matches else None
+
+
+def get_job(job_id: str) -> dict | None:
+    """In-process state of a background job, None if it was not submitted here."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+def run_job(
+    file_path: str,
+    job_id: str,
+    df: pl.DataFrame | None = None,
+    stream: bool = False,
+    file_format: str | None = None,
+    dry_run: bool = False,
+    resume: bool = False,
+    mode: str = 'insert'
+) -> str | None:
+    """Run `process_excel` on an uploaded file, reusing `df` when it is already parsed.
+    With `dry_run` the file is only validated, with `resume` the rows committed
+    by an earlier run of `job_id` are skipped, `mode` 'sync' updates existing employees, see `process_excel`.
+    Returns the path of the failed-records workbook, None when every record was inserted."""
+
+    success, failed_df = process_excel(
+        file_path=file_path,
+        job_id=job_id,
+        df=df,
+        stream=stream,
+        file_format=file_format,
+        dry_run=dry_run,
+        resume=resume,
+        mode=mode
+    )
+
+    if success:
+        return None
+
+    failed_file = os.path.join(JOB_FILES_DIR, f"{job_id}_failed.xlsx")
+    failed_df.to_pandas().to_excel(failed_file, index=False)
+    return failed_file
+
+
+def queue_run_job(*args, **kwargs) -> Future:
+    """`run_job` on the bounded job pool, for callers that wait for the result themselves.
+    Synchronous uploads queue here like background ones instead of running on an unbounded
+    thread, so concurrent uploads never need more DB connections than the pool holds."""
+    return _executor.submit(run_job, *args, **kwargs)
+
+
+def _execute(
+    file_path: str,
+    job_id: str,
+    df: pl.DataFrame | None,
+    stream: bool,
+    file_format: str | None,
+    resume: bool,
+    mode: str
+) -> None:
+
+    _update_job(job_id, status='PROCESSING')
+    try:
+        failed_file = run_job(file_path, job_id, df, stream, file_format, resume=resume, mode=mode)
+        _update_job(job_id, status='COMPLETED', failed_file=failed_file)
+        print(f"[Check] : ✅ Job `{job_id}` completed.")
+    except Exception as e:
+        # the upload is kept for POST /jobs/{job_id}/resume
+        _update_job(job_id, status='FAILED', error=str(e))
+        print(f"[JobError] : ❌ Job `{job_id}` failed due to `{e}`")
+    else:
+        os.remove(file_path)
+
+
+def submit_job(
+    file_path: str,
+    job_id: str,
+    file_name: str,
+    df: pl.DataFrame | None = None,
+    stream: bool = False,
+    file_format: str | None = None,
+    resume: bool = False,
+    mode: str = 'insert'
+) -> None:
+    """Queue an uploaded file for background processing. The job owns `file_path` from here on,
+    it is removed once the job completes and kept for a resume when it fails."""
+
+    _update_job(
+        job_id,
+        status='PENDING',
+        file_name=file_name,
+        failed_file=None,
+        error=None
+    )
+    _executor.submit(_execute, file_path, job_id, df, stream, file_format, resume, mode)
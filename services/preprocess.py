@@ -0,0 +1,326 @@
+import polars as pl
+
+from bulk_upload.config import (
+    FIELD_MAP,
+    FIELD_MANDATORY,
+    DESIGNATION_MAPP,
+    QUALIFICATION_MAPP,
+    clean_str,
+    clean_upper,
+    clean_age
+)
+
+# Columns added by the resolution stage, dropped again before the failed-records report
+RESOLVED_COLUMNS = [
+    '_designation',
+    '_designation_id',
+    '_qualification',
+    '_salary_slab',
+    '_qualification_slab_id',
+    '_work_ex_slab_id',
+]
+
+# Error message columns written by the set-based stages
+ERROR_COLUMNS = [
+    'FieldNotFoundError',
+    'designationIdError',
+    'qualificationSlabIdError',
+    'workExSlabIdError',
+    'duplicateInFileError',
+    'duplicateInDBError',
+]
+
+# Sync mode: rows of employees already in DB, they are updated and skip the DB duplicate check
+SYNC_UPDATE_COLUMN = '_sync_update'
+
+# Upload column -> `mmt_employees` column that must stay unique
+DEDUP_KEYS = {
+    'emp_id': 'emp_uuid',
+    'email': 'email',
+    'mobile_no': 'mobile_no',
+}
+
+
+def _as_text(expr: pl.Expr) -> pl.Expr:
+    """Render a value the way an f-string would, `None` included."""
+    return expr.cast(pl.Utf8).fill_null('None')
+
+
+# ------------------------------------------------------------
+# ----------------- CLEANING & MANDATORY CHECK ---------------
+# ------------------------------------------------------------
+
+def _clean_expr(field: str, transform, dtype: pl.DataType) -> pl.Expr:
+    """Polars equivalent of a `FIELD_MAP` transform for a column of `dtype`."""
+
+    col = pl.col(field)
+    is_text = dtype == pl.Utf8
+
+    if transform is clean_str:
+        return col.str.strip_chars() if is_text else col
+
+    if transform is clean_upper:
+        return col.str.strip_chars().str.to_uppercase() if is_text else col
+
+    if transform is clean_age:
+        return col.cast(pl.Int64, strict=False).cast(pl.Utf8) if dtype.is_numeric() else col
+
+    if transform is str:
+        if dtype == pl.Datetime:
+            return col.dt.to_string('%Y-%m-%d %H:%M:%S')
+        return col.cast(pl.Utf8)
+
+    if transform is float:
+        # float() ignores surrounding whitespace, the cast does not
+        return (col.str.strip_chars() if is_text else col).cast(pl.Float64, strict=False)
+
+    raise ValueError(f"No columnar equivalent for transform `{transform}` of field `{field}`")
+
+
+def clean_and_validate(df: pl.DataFrame) -> pl.DataFrame:
+    """Apply the `FIELD_MAP` cleaning rules column-wise and flag missing mandatory fields.
+
+    Fields absent from the upload are added as nulls. The `FieldNotFoundError`
+    column lists every null `FIELD_MANDATORY` field of the row (null when none).
+    """
+
+    missing = [field for field in FIELD_MAP if field not in df.columns]
+    if missing:
+        df = df.with_columns([pl.lit(None).alias(field) for field in missing])
+
+    # Mandatory check runs on the raw values, before any cleaning
+    field_not_found = (
+        pl.concat_list([
+            pl.when(pl.col(field).is_null())
+            .then(pl.lit(f"[FieldNotFound] : `{field}` "))
+            for field in FIELD_MANDATORY
+        ])
+        .list.drop_nulls()
+        .list.join(';\n')
+    )
+
+    schema = df.schema
+    return df.with_columns(
+        pl.when(field_not_found != '')
+        .then(field_not_found)
+        .alias('FieldNotFoundError'),
+
+        *[
+            _clean_expr(field, transform, schema[field]).alias(field)
+            for field, transform in FIELD_MAP.items()
+        ]
+    )
+
+
+# ------------------------------------------------------------
+# ------------------- SLAB ID RESOLUTION ---------------------
+# ------------------------------------------------------------
+
+def resolve_slab_ids(
+    df: pl.DataFrame,
+    designation_mapping: dict,
+    df_qualification: pl.DataFrame,
+    df_workExSlab: pl.DataFrame,
+    qualifications_in_db: list,
+) -> pl.DataFrame:
+    """Resolve designation, qualification slab and work-ex slab ids for the whole upload.
+
+    Adds the `RESOLVED_COLUMNS` plus one message column per `ERROR_COLUMNS`
+    entry (null when the id resolved).
+    """
+
+    qualification = pl.col('scale_considered').cast(pl.Utf8).str.strip_chars()
+    designation = pl.col('new_hierarchical_designation').cast(pl.Utf8).str.strip_chars()
+
+    df = df.with_columns(
+        pl.when(qualification.is_in(qualifications_in_db))
+        .then(qualification)
+        .otherwise(qualification.replace(QUALIFICATION_MAPP))
+        .alias('_qualification'),
+
+        pl.when(designation.is_in(list(designation_mapping.keys())))
+        .then(designation)
+        .otherwise(designation.replace(DESIGNATION_MAPP))
+        .alias('_designation'),
+
+        pl.col('final_slab_considered')
+        .cast(pl.Utf8)
+        .str.strip_chars()
+        .str.to_uppercase()
+        .alias('_salary_slab'),
+    ).with_columns(
+        pl.col('_designation')
+        .replace_strict(designation_mapping, default=None, return_dtype=pl.Int64)
+        .alias('_designation_id')
+    )
+
+    # (slab_name, fk_designation_id) -> qualification slab id, first match wins
+    qualification_slabs = (
+        df_qualification
+        .select(
+            pl.col('slab_name').cast(pl.Utf8).alias('_qualification'),
+            pl.col('fk_designation_id').cast(pl.Int64).alias('_designation_id'),
+            pl.col('id').cast(pl.Int64).alias('_qualification_slab_id'),
+        )
+        .unique(subset=['_qualification', '_designation_id'], keep='first', maintain_order=True)
+    )
+    df = df.join(
+        qualification_slabs,
+        on=['_qualification', '_designation_id'],
+        how='left',
+        maintain_order='left'
+    )
+
+    # (grade, fk_designation_id, fk_qualification_slab) -> work-ex slab id
+    work_ex_slabs = (
+        df_workExSlab
+        .select(
+            pl.col('grade').cast(pl.Utf8).alias('_salary_slab'),
+            pl.col('fk_designation_id').cast(pl.Int64).alias('_designation_id'),
+            pl.col('fk_qualification_slab').cast(pl.Int64).alias('_qualification_slab_id'),
+            pl.col('id').cast(pl.Int64).alias('_work_ex_slab_id'),
+        )
+        .unique(subset=['_salary_slab', '_designation_id', '_qualification_slab_id'], keep='first', maintain_order=True)
+    )
+    df = df.join(
+        work_ex_slabs,
+        on=['_salary_slab', '_designation_id', '_qualification_slab_id'],
+        how='left',
+        maintain_order='left'
+    )
+
+    return df.with_columns(
+        pl.when(pl.col('_designation_id').is_null())
+        .then(pl.format(
+            "[designationIdError] : Designation id not found corresponding to designation `{}` ",
+            _as_text(pl.col('_designation'))
+        ))
+        .alias('designationIdError'),
+
+        pl.when(pl.col('_qualification_slab_id').is_null())
+        .then(pl.format(
+            "[qualificationSlabIdError] : No id found corresponding to qualification `{}` & designationId `{}`",
+            _as_text(pl.col('_qualification')),
+            _as_text(pl.col('_designation_id'))
+        ))
+        .alias('qualificationSlabIdError'),
+
+        pl.when(pl.col('_work_ex_slab_id').is_null())
+        .then(pl.format(
+            "[workExSlabIdError] : No id found corresponding to grade `{}`,fk_designation_id `{}` & fk_qualification_slab `{}`",
+            _as_text(pl.col('_salary_slab')),
+            _as_text(pl.col('_designation_id')),
+            _as_text(pl.col('_qualification_slab_id'))
+        ))
+        .alias('workExSlabIdError'),
+    )
+
+
+# ------------------------------------------------------------
+# ------------------- DUPLICATE DETECTION --------------------
+# ------------------------------------------------------------
+
+def _dedup_key(expr: pl.Expr, field: str) -> pl.Expr:
+    """Comparable form of a `DEDUP_KEYS` value, emails compare case-insensitively like the DB collation."""
+    key = expr.cast(pl.Utf8).str.strip_chars()
+    return key.str.to_lowercase() if field == 'email' else key
+
+
+def dedup_values(df: pl.DataFrame) -> dict:
+    """Distinct non-null `DEDUP_KEYS` values of the upload, to look up in DB."""
+    return {
+        field: df.select(_dedup_key(pl.col(field), field).drop_nulls().unique())[field].to_list()
+        for field in DEDUP_KEYS
+    }
+
+
+def flag_duplicates(df: pl.DataFrame, existing: dict, owners: dict | None = None) -> pl.DataFrame:
+    """Flag rows whose `DEDUP_KEYS` repeat within the upload or already exist in DB.
+
+    `existing` maps each upload column to the values of it already present in
+    `mmt_employees`. Every occurrence of an in-file duplicate is flagged, the
+    upload does not say which one is right. Rows marked in `SYNC_UPDATE_COLUMN`
+    are their own DB rows: they are checked against `owners` instead, which maps
+    each upload column to {value: emp_uuid holding it}, and only fail when the
+    value belongs to another employee. Adds `duplicateInFileError` and
+    `duplicateInDBError` (null when the row is unique).
+    """
+
+    is_update = pl.col(SYNC_UPDATE_COLUMN) if SYNC_UPDATE_COLUMN in df.columns else pl.lit(False)
+    own_uuid = _dedup_key(pl.col('emp_id'), 'emp_id')
+    owners = owners or {}
+
+    def _joined(messages: list) -> pl.Expr:
+        joined = pl.concat_list(messages).list.drop_nulls().list.join(';\n')
+        return pl.when(joined != '').then(joined)
+
+    in_file = []
+    in_db = []
+    for field in DEDUP_KEYS:
+        key = _dedup_key(pl.col(field), field)
+        in_db_values = pl.select(
+            _dedup_key(pl.lit(pl.Series(existing.get(field, []), dtype=pl.Utf8)), field)
+        ).to_series().to_list()
+        field_owners = (
+            pl.DataFrame(
+                {'key': list(owners.get(field, {})), 'owner': list(owners.get(field, {}).values())},
+                schema={'key': pl.Utf8, 'owner': pl.Utf8},
+                strict=False
+            )
+            .select(_dedup_key(pl.col('key'), field), 'owner')
+            .unique(subset=['key'], keep='first', maintain_order=True)
+        )
+        owner = key.replace_strict(field_owners['key'], field_owners['owner'], default=None, return_dtype=pl.Utf8)
+
+        in_file.append(
+            pl.when(key.is_not_null() & (pl.len().over(key) > 1))
+            .then(pl.format(
+                "[duplicateInFileError] : `{}` `{}` appears {} times in the file",
+                pl.lit(field),
+                key,
+                pl.len().over(key)
+            ))
+        )
+        in_db.append(
+            pl.when(
+                (~is_update & key.is_in(in_db_values))
+                | (is_update & owner.is_not_null() & (owner != own_uuid))
+            )
+            .then(pl.format(
+                "[duplicateInDBError] : `{}` `{}` already exists in `mmt_employees`",
+                pl.lit(field),
+                key
+            ))
+        )
+
+    return df.with_columns(
+        _joined(in_file).alias('duplicateInFileError'),
+        _joined(in_db).alias('duplicateInDBError'),
+    )
+
+
+# ------------------------------------------------------------
+# ------------------ FAILED ROWS SEPARATION ------------------
+# ------------------------------------------------------------
+
+def split_failed(
+    df: pl.DataFrame,
+    error_columns: list = ERROR_COLUMNS,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Split rows with any error message off into a frame with a joined `Error` column.
+
+    Returns (valid rows without the error columns, failed rows).
+    """
+
+    error_columns = [c for c in error_columns if c in df.columns]
+    df = df.with_columns(
+        pl.concat_list(error_columns)
+        .list.drop_nulls()
+        .list.join(';\n')
+        .alias('Error')
+    )
+
+    df_failed = df.filter(pl.col('Error') != '').drop(error_columns)
+    df_valid = df.filter(pl.col('Error') == '').drop(error_columns + ['Error'])
+
+    return df_valid, df_failed
@@ -0,0 +1,140 @@
+import threading
+import pymysql
+
+from bulk_upload.config import (
+    BATCH_UPDATE_SIZE,
+    PROGRESS_FLUSH_INTERVAL,
+    PROGRESS_MAX_BACKOFF
+)
+from bulk_upload.db import (
+    get_pool,
+    update_job_progress,
+    finish_job
+)
+
+
+class ProgressReporter:
+    """Background writer of one job's `records_completed` in `mmt_uploadprocess_logs`.
+
+    `add` only bumps an in-memory counter, it never touches the DB. A daemon
+    thread holding one pooled connection coalesces the increments and flushes
+    them once `flush_rows` are pending or every `flush_interval` seconds.
+    `close` stops the thread and writes the remaining count together with
+    the terminal status in one UPDATE.
+
+    Failed flushes are logged and retried after `flush_interval`, doubling up
+    to PROGRESS_MAX_BACKOFF while they keep failing. The connection is only
+    replaced after a connection error. Progress is bookkeeping and must not
+    fail the upload.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        db_cred: tuple,
+        flush_rows: int = BATCH_UPDATE_SIZE,
+        flush_interval: float = PROGRESS_FLUSH_INTERVAL,
+    ):
+        self.job_id = job_id
+        self.db_cred = db_cred
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        self._pool = get_pool(*db_cred)
+        self._conn = None
+        self._pending = 0
+        self._failures = 0      # consecutive failed flushes, drives the backoff
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"progress-{job_id}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def add(self, count: int) -> None:
+        """Record `count` more processed records, never blocks on the DB."""
+        if count <= 0:
+            return
+        with self._lock:
+            self._pending += count
+            due = self._pending >= self.flush_rows
+        if due:
+            self._wake.set()
+
+    def _take(self) -> int:
+        with self._lock:
+            count, self._pending = self._pending, 0
+        return count
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self._pool.acquire()
+        return self._conn
+
+    def _drop_connection(self) -> None:
+        if self._conn is not None:
+            self._pool.release(self._conn, discard=True)
+            self._conn = None
+
+    @staticmethod
+    def _is_connection_error(e: BaseException) -> bool:
+        while e is not None:
+            if isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError, ConnectionError)):
+                return True
+            e = e.__cause__ or e.__context__
+        return False
+
+    def _flush(self) -> None:
+        count = self._take()
+        if not count:
+            return
+        try:
+            update_job_progress(self.job_id, count, *self.db_cred, conn=self._connection())
+            self._failures = 0
+        except Exception as e:
+            # keep the increment for the next flush, without waking the thread again
+            with self._lock:
+                self._pending += count
+            self._failures += 1
+            if self._is_connection_error(e):
+                self._drop_connection()
+            print(f"[Warning] : Progress update for job `{self.job_id}` failed due to `{e}` (attempt {self._failures})")
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            if self._failures:
+                # wake-ups from `add` do not cut a backoff short, only `close` does
+                self._closed.wait(min(self.flush_interval * 2 ** min(self._failures, 16), PROGRESS_MAX_BACKOFF))
+            else:
+                self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._closed.is_set():
+                self._flush()
+
+    def close(self, status: str, total_record: int | None = None) -> None:
+        """Stop flushing and write the final count with the terminal `status` ('COMPLETED' / 'FAILED'),
+        and the real `total_record` when the job was created with an estimate."""
+
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+
+        try:
+            finish_job(
+                self.job_id,
+                self._take(),
+                status,
+                *self.db_cred,
+                conn=self._connection(),
+                total_record=total_record
+            )
+        except Exception as e:
+            self._drop_connection()
+            raise RuntimeError(f"Failed to finish job `{self.job_id}`: {e}")
+        finally:
+            if self._conn is not None:
+                self._pool.release(self._conn)
+                self._conn = None
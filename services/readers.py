@@ -0,0 +1,190 @@
+import os
+import polars as pl
+
+from typing import Iterator
+from bulk_upload.config import (
+    FIELD_MAP,
+    EXCEL_CHUNK_SIZE
+)
+
+# Supported upload formats, by file extension
+UPLOAD_EXTENSIONS = {
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.arrow': 'ipc',
+    '.ipc': 'ipc',
+    '.feather': 'ipc',
+}
+
+# Leading bytes -> format, checked before the extension
+MAGIC_BYTES = [
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'ipc'),
+    (b'PK\x03\x04', 'excel'),                 # xlsx (zip container)
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'excel'), # xls (OLE2 container)
+]
+
+# Text columns of FIELD_MAP stay text in CSV input (keeps leading zeros of ids, phone numbers, ...)
+CSV_SCHEMA_OVERRIDES = {
+    field: pl.Float64 if transform is float else pl.Utf8
+    for field, transform in FIELD_MAP.items()
+}
+
+
+def _load_workbook(file_path: str):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ValueError("Streaming Excel input needs `openpyxl` installed") from e
+
+    return load_workbook(file_path, read_only=True, data_only=True)
+
+
+def _rows_to_frame(header: list, rows: list) -> pl.DataFrame:
+    width = len(header)
+    rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+    return pl.DataFrame(
+        rows,
+        schema=header,
+        orient='row',
+        strict=False,
+        infer_schema_length=None
+    )
+
+
+def iter_excel_chunks(
+    file_path: str,
+    chunk_size: int = EXCEL_CHUNK_SIZE
+) -> Iterator[pl.DataFrame]:
+    """Read the first sheet of an `.xlsx` workbook `chunk_size` rows at a time.
+
+    Uses openpyxl's read-only mode, so peak memory follows the chunk size
+    rather than the file size. Fully empty rows are skipped, like `pl.read_excel`.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    workbook = _load_workbook(file_path)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [
+            str(name).strip() if name is not None else f"__UNNAMED__{idx}"
+            for idx, name in enumerate(header)
+        ]
+
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield _rows_to_frame(header, chunk)
+                chunk = []
+
+        if chunk:
+            yield _rows_to_frame(header, chunk)
+
+    finally:
+        workbook.close()
+
+
+def estimate_excel_rows(file_path: str) -> int:
+    """Data rows in the first sheet from its recorded dimension, no row is parsed.
+    Blank rows count and a sheet without a dimension gives 0, so it is only an estimate."""
+
+    workbook = _load_workbook(file_path)
+    try:
+        max_row = workbook.worksheets[0].max_row
+        return max(max_row - 1, 0) if max_row else 0   # header
+    finally:
+        workbook.close()
+
+
+def detect_format(file_path: str, file_name: str | None = None) -> str:
+    """Format of an upload from its magic bytes, falling back to the extension of `file_name`."""
+
+    with open(file_path, 'rb') as f:
+        head = f.read(8)
+
+    for magic, fmt in MAGIC_BYTES:
+        if head.startswith(magic):
+            return fmt
+
+    ext = os.path.splitext(file_name or file_path)[1].lower()
+    if ext in UPLOAD_EXTENSIONS:
+        return UPLOAD_EXTENSIONS[ext]
+
+    raise ValueError(f"Unsupported file type `{ext}`, expected one of {sorted(UPLOAD_EXTENSIONS)}")
+
+
+def _scan(file_path: str, file_format: str) -> pl.LazyFrame:
+    if file_format == 'csv':
+        return pl.scan_csv(file_path, schema_overrides=CSV_SCHEMA_OVERRIDES)
+    if file_format == 'parquet':
+        return pl.scan_parquet(file_path)
+    if file_format == 'ipc':
+        return pl.scan_ipc(file_path)
+    raise ValueError(f"`{file_format}` input cannot be scanned lazily")
+
+
+def read_upload(file_path: str, file_format: str) -> pl.DataFrame:
+    """Read a whole upload with the native Polars reader of its format."""
+
+    if file_format == 'excel':
+        return pl.read_excel(file_path)
+    if file_format == 'csv':
+        return pl.read_csv(file_path, schema_overrides=CSV_SCHEMA_OVERRIDES)
+    if file_format == 'parquet':
+        return pl.read_parquet(file_path)
+    if file_format == 'ipc':
+        return pl.read_ipc(file_path)
+    raise ValueError(f"Unsupported file format `{file_format}`")
+
+
+def iter_upload_chunks(
+    file_path: str,
+    file_format: str,
+    chunk_size: int = EXCEL_CHUNK_SIZE
+) -> Iterator[pl.DataFrame]:
+    """Read an upload of any supported format `chunk_size` rows at a time."""
+
+    if file_format == 'excel':
+        yield from iter_excel_chunks(file_path, chunk_size)
+        return
+
+    if file_format == 'csv':
+        reader = pl.read_csv_batched(
+            file_path,
+            schema_overrides=CSV_SCHEMA_OVERRIDES,
+            batch_size=chunk_size
+        )
+        while batches := reader.next_batches(1):
+            yield from batches
+        return
+
+    # Parquet / IPC: row groups and record batches make slicing cheap
+    lf = _scan(file_path, file_format)
+    offset = 0
+    while True:
+        chunk = lf.slice(offset, chunk_size).collect()
+        if chunk.is_empty():
+            return
+        yield chunk
+        offset += chunk.height
+
+
+def count_upload_rows(file_path: str, file_format: str) -> int:
+    """Data rows in an upload, without materializing them.
+    Excel is only estimated by `estimate_excel_rows`, a full pass would parse the workbook twice,
+    `process_excel` writes the real count to the job when it completes."""
+
+    if file_format == 'excel':
+        return estimate_excel_rows(file_path)
+    return _scan(file_path, file_format).select(pl.len()).collect().item()
@@ -0,0 +1,285 @@
+import time
+import threading
+import polars as pl
+
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from bulk_upload.config import (
+    SUB_DESIGNATIONS,
+    REGION,
+    BRANCH,
+    LOCATION,
+    ZONE_MASTER,
+    DEPARTMENT,
+    FUNCTIONAL_ROLES,
+    SLAB_MASTER,
+    QUALIFICATION,
+    DG_DESIGNATIONS,
+    DB_POOL_SIZE,
+    REFERENCE_CACHE_TTL,
+    REFERENCE_CACHE_TTL_DEFAULT
+)
+from bulk_upload.db import (
+    fetch_from_db,
+    fetch_table_fingerprints
+)
+
+# table -> only the columns the upload needs, primary key first
+REFERENCE_TABLES = {
+    SUB_DESIGNATIONS: ['id', 'name'],
+    REGION: ['id', 'rg_name'],
+    BRANCH: ['branch_id', 'branch_name'],
+    LOCATION: ['location_id', 'location_name'],
+    ZONE_MASTER: ['id', 'rg_name'],
+    DEPARTMENT: ['dept_id', 'dept_name'],
+    FUNCTIONAL_ROLES: ['id', 'role_name'],
+    SLAB_MASTER: ['id', 'grade', 'fk_designation_id', 'fk_qualification_slab'],
+    QUALIFICATION: ['id', 'slab_name', 'fk_designation_id'],
+    DG_DESIGNATIONS: ['design_id', 'designation_name'],
+}
+
+
+@dataclass
+class ReferenceData:
+    """Master-table lookups needed to resolve the ids of an upload."""
+
+    # name -> id
+    subDesignationsMapping: dict
+    regionsMapping: dict
+    branchMapping: dict
+    locationsMapping: dict
+    zonesMapping: dict
+    deptMapping: dict
+    funcRolesMapping: dict
+    designationMapping: dict
+
+    # slab tables, joined against the upload by `resolve_slab_ids`
+    df_qualification: pl.DataFrame
+    df_workExSlab: pl.DataFrame
+    uniqueQualificationsInDB: list
+
+    # table -> seconds spent loading it
+    load_timings: dict = field(default_factory=dict)
+
+
+def _mapping(df: pl.DataFrame, key: str, value: str) -> dict:
+    return dict(zip(df[key].to_list(), df[value].to_list()))
+
+
+def _load_table(table: str, columns: list, db_cred: tuple) -> tuple[pl.DataFrame, float]:
+
+    start = time.perf_counter()
+    df = fetch_from_db(table, *db_cred, attributes=columns)
+
+    # An empty table comes back without columns
+    if df.is_empty():
+        df = pl.DataFrame(schema=columns)
+
+    return df.select(columns), time.perf_counter() - start
+
+
+def load_reference_tables(
+    tables: dict,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> tuple[dict, dict]:
+    """Fetch `tables` ({table: columns}) concurrently.
+    Returns ({table: DataFrame}, {table: seconds})."""
+
+    db_cred = (host, user, password, database, port)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(tables), DB_POOL_SIZE))) as executor:
+        futures = {
+            table: executor.submit(_load_table, table, columns, db_cred)
+            for table, columns in tables.items()
+        }
+        loaded = {table: future.result() for table, future in futures.items()}
+
+    frames = {table: df for table, (df, _) in loaded.items()}
+    timings = {table: seconds for table, (_, seconds) in loaded.items()}
+    return frames, timings
+
+
+def build_reference_data(frames: dict, timings: dict | None = None) -> ReferenceData:
+    """Turn the loaded `REFERENCE_TABLES` frames into lookups."""
+
+    df_qualification = frames[QUALIFICATION].with_columns(
+        pl.col("slab_name")
+        .cast(pl.Utf8)
+        .str.replace_all(r"^\s+|\s+$", "")   # strip using regex
+    )
+
+    return ReferenceData(
+        subDesignationsMapping=_mapping(frames[SUB_DESIGNATIONS], 'name', 'id'),
+        regionsMapping=_mapping(frames[REGION], 'rg_name', 'id'),
+        branchMapping=_mapping(frames[BRANCH], 'branch_name', 'branch_id'),
+        locationsMapping=_mapping(frames[LOCATION], 'location_name', 'location_id'),
+        zonesMapping=_mapping(frames[ZONE_MASTER], 'rg_name', 'id'),
+        deptMapping=_mapping(frames[DEPARTMENT], 'dept_name', 'dept_id'),
+        funcRolesMapping=_mapping(frames[FUNCTIONAL_ROLES], 'role_name', 'id'),
+        designationMapping=_mapping(frames[DG_DESIGNATIONS], 'designation_name', 'design_id'),
+        df_qualification=df_qualification,
+        df_workExSlab=frames[SLAB_MASTER],
+        uniqueQualificationsInDB=sorted(df_qualification['slab_name'].drop_nulls().unique().to_list()),
+        load_timings=dict(timings or {}),
+    )
+
+
+class ReferenceDataCache:
+    """Process-wide cache of the `REFERENCE_TABLES` shared by every upload.
+
+    Entries are kept per set of credentials, like the connection pools, so a
+    job against another database never gets these master tables. A table is
+    served from memory while younger than its TTL. Once the TTL has passed
+    its row count and max primary key are compared with the cached ones (one
+    UNION ALL query for all stale tables) and it is only reloaded when they
+    changed.
+    """
+
+    def __init__(self, tables: dict = REFERENCE_TABLES) -> None:
+        self.tables = tables
+        self._lock = threading.Lock()
+        self._entries = {}          # db_cred -> {table -> {'df', 'fingerprint', 'checked_at'}}
+        self._bundles = {}          # db_cred -> ReferenceData built from its current entries
+        self._stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'invalidations': 0,
+        }
+
+    def _ttl(self, table: str) -> float:
+        return REFERENCE_CACHE_TTL.get(table, REFERENCE_CACHE_TTL_DEFAULT)
+
+    def get(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        database: str,
+        port: int = 3306,
+    ) -> ReferenceData:
+
+        db_cred = (host, user, password, database, port)
+
+        # One loader at a time, concurrent jobs wait for it instead of loading twice
+        with self._lock:
+            entries = self._entries.setdefault(db_cred, {})
+            now = time.monotonic()
+            stale = [
+                table for table in self.tables
+                if table not in entries
+                or now - entries[table]['checked_at'] > self._ttl(table)
+            ]
+            fresh = len(self.tables) - len(stale)
+            self._stats['hits'] += fresh
+
+            # Cheap change detection, taken before any load so a change made
+            # while loading shows up at the next TTL expiry instead of being cached as fresh
+            fingerprints = fetch_table_fingerprints(
+                {t: self.tables[t][0] for t in stale},
+                *db_cred
+            ) if stale else {}
+
+            to_load = {}
+            for table in stale:
+                entry = entries.get(table)
+                if entry is not None and fingerprints.get(table) == entry['fingerprint']:
+                    entry['checked_at'] = now
+                    self._stats['revalidated'] += 1
+                else:
+                    to_load[table] = self.tables[table]
+
+            if to_load or db_cred not in self._bundles:
+                self._stats['misses'] += len(to_load)
+                frames, timings = load_reference_tables(to_load, *db_cred) if to_load else ({}, {})
+                for table, seconds in timings.items():
+                    print(f"[Info] Loaded `{table}` ({frames[table].height} rows) in {seconds:.3f}s")
+
+                for table, df in frames.items():
+                    entries[table] = {
+                        'df': df,
+                        'fingerprint': fingerprints.get(table),
+                        'checked_at': now,
+                    }
+                self._bundles[db_cred] = build_reference_data(
+                    {t: e['df'] for t, e in entries.items()},
+                    timings
+                )
+            else:
+                print(f"[Info] Reference data served from cache ({fresh} fresh, {len(stale)} revalidated)")
+
+            return self._bundles[db_cred]
+
+    def invalidate(self, table: str | None = None) -> list:
+        """Drop one table (or all of them) of every database so the next upload reloads it.
+        Returns the tables actually dropped, empty when nothing was cached."""
+
+        if table is not None and table not in self.tables:
+            raise ValueError(f"`{table}` is not a cached reference table")
+
+        with self._lock:
+            dropped = set()
+            for entries in self._entries.values():
+                for t in ([table] if table is not None else list(entries)):
+                    if entries.pop(t, None) is not None:
+                        dropped.add(t)
+            self._bundles.clear()
+            self._stats['invalidations'] += len(dropped)
+            return sorted(dropped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self._stats,
+                'databases': [
+                    {
+                        'host': host,
+                        'database': database,
+                        'port': port,
+                        'tables': {
+                            table: {
+                                'age_seconds': round(now - entry['checked_at'], 3),
+                                'ttl_seconds': self._ttl(table),
+                                'rows': entry['df'].height,
+                            }
+                            for table, entry in entries.items()
+                        },
+                    }
+                    for (host, _user, _password, database, port), entries in self._entries.items()
+                ],
+            }
+
+
+reference_cache = ReferenceDataCache()
+
+
+def load_reference_data(
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    use_cache: bool = True,
+) -> ReferenceData:
+    """Load every master table the upload needs, concurrently, and report per-table timings.
+    Goes through the process-wide `reference_cache` unless `use_cache` is False."""
+
+    start = time.perf_counter()
+
+    if use_cache:
+        reference = reference_cache.get(host, user, password, database, port)
+    else:
+        frames, timings = load_reference_tables(
+            REFERENCE_TABLES,
+            host, user, password, database, port
+        )
+        for table, seconds in timings.items():
+            print(f"[Info] Loaded `{table}` ({frames[table].height} rows) in {seconds:.3f}s")
+        reference = build_reference_data(frames, timings)
+
+    print(f"[Info] Reference data ready in {time.perf_counter() - start:.3f}s")
+    return reference
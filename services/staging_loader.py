@@ -0,0 +1,134 @@
+import uuid
+
+from bulk_upload.config import (
+    EMPLOYEES_PERSONAL_DETAILS,
+    DEPENDENT_TABLES
+)
+from bulk_upload.db import (
+    get_pool,
+    insert_many_into_db,
+    insert_job_checkpoints
+)
+
+# Extra staging column carrying the employee key the dependent rows are joined on
+STAGING_EMP_UUID = '_stg_emp_uuid'
+
+
+def _column_list(payloads: list, table: str) -> list:
+    """Union of the payload columns of `table`, in first-seen order, without `fk_emp_id`."""
+    columns = {}
+    for payload in payloads:
+        for column in payload[table]:
+            if column != 'fk_emp_id':
+                columns.setdefault(column, None)
+    return list(columns)
+
+
+def stage_and_load(
+    payloads: list,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    checkpoint: tuple | None = None,
+) -> dict:
+    """Bulk load employees ({table: payload} each) into temporary copies of the target tables,
+    then fill the targets with INSERT ... SELECT joined on emp_uuid, all in one transaction.
+    Returns emp_uuid -> new emp_id, raises RuntimeError with nothing committed on any failure."""
+
+    emp_uuids = [payload[EMPLOYEES_PERSONAL_DETAILS]['emp_uuid'] for payload in payloads]
+    if len(set(emp_uuids)) != len(emp_uuids):
+        raise RuntimeError("Staged rows contain duplicate emp_uuid values")
+
+    db_cred = (host, user, password, database, port)
+    suffix = uuid.uuid4().hex[:12]
+    staging = {
+        table: f"_stg_{suffix}_{table}"
+        for table in (EMPLOYEES_PERSONAL_DETAILS, *DEPENDENT_TABLES)
+    }
+
+    with get_pool(*db_cred).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+
+                # DDL first: ALTER TABLE commits implicitly, even on temporary tables
+                for table, staging_table in staging.items():
+                    cursor.execute(f"CREATE TEMPORARY TABLE `{staging_table}` LIKE `{table}`")
+                    if table != EMPLOYEES_PERSONAL_DETAILS:
+                        cursor.execute(f"""
+                            ALTER TABLE `{staging_table}`
+                            MODIFY `fk_emp_id` BIGINT NULL,
+                            ADD COLUMN `{STAGING_EMP_UUID}` VARCHAR(255) NULL
+                        """)
+
+                # ---------------- LOAD STAGING ----------------
+                for table, staging_table in staging.items():
+                    rows = [payload[table] for payload in payloads]
+                    if table != EMPLOYEES_PERSONAL_DETAILS:
+                        rows = [
+                            {**row, STAGING_EMP_UUID: emp_uuid}
+                            for row, emp_uuid in zip(rows, emp_uuids)
+                        ]
+                    insert_many_into_db(rows, staging_table, *db_cred, conn=conn)
+
+                # ids above this belong to the employees inserted here
+                cursor.execute(f"SELECT COALESCE(MAX(`emp_id`), 0) FROM `{EMPLOYEES_PERSONAL_DETAILS}`")
+                max_emp_id = cursor.fetchone()[0]
+
+                # ---------------- SET-BASED INSERTS ----------------
+                col_str = ", ".join(f"`{c}`" for c in _column_list(payloads, EMPLOYEES_PERSONAL_DETAILS))
+                inserted = cursor.execute(f"""
+                    INSERT INTO `{EMPLOYEES_PERSONAL_DETAILS}` ({col_str})
+                    SELECT {col_str} FROM `{staging[EMPLOYEES_PERSONAL_DETAILS]}`
+                """)
+                if inserted != len(payloads):
+                    raise RuntimeError(f"{inserted} of {len(payloads)} rows written to `{EMPLOYEES_PERSONAL_DETAILS}`")
+
+                for table in DEPENDENT_TABLES:
+                    columns = _column_list(payloads, table)
+                    inserted = cursor.execute(f"""
+                        INSERT INTO `{table}` (`fk_emp_id`, {", ".join(f"`{c}`" for c in columns)})
+                        SELECT e.`emp_id`, {", ".join(f"s.`{c}`" for c in columns)}
+                        FROM `{staging[table]}` s
+                        JOIN `{EMPLOYEES_PERSONAL_DETAILS}` e
+                          ON e.`emp_uuid` = s.`{STAGING_EMP_UUID}`
+                         AND e.`emp_id` > %s
+                    """, (max_emp_id,))
+                    if inserted != len(payloads):
+                        raise RuntimeError(f"{inserted} of {len(payloads)} rows written to `{table}`")
+
+                cursor.execute(f"""
+                    SELECT e.`emp_uuid`, e.`emp_id`
+                    FROM `{EMPLOYEES_PERSONAL_DETAILS}` e
+                    JOIN `{staging[EMPLOYEES_PERSONAL_DETAILS]}` s
+                      ON s.`emp_uuid` = e.`emp_uuid`
+                    WHERE e.`emp_id` > %s
+                """, (max_emp_id,))
+                new_ids = {str(emp_uuid): emp_id for emp_uuid, emp_id in cursor.fetchall()}
+
+            if checkpoint is not None:
+                job_id, row_indices = checkpoint
+                insert_job_checkpoints(
+                    job_id,
+                    row_indices,
+                    [new_ids[str(emp_uuid)] for emp_uuid in emp_uuids],
+                    *db_cred,
+                    conn=conn
+                )
+
+            conn.commit()
+            return new_ids
+
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Staging load failed: {e}")
+
+        finally:
+            # Temporary tables live as long as the pooled connection, drop them explicitly
+            try:
+                with conn.cursor() as cursor:
+                    for staging_table in staging.values():
+                        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{staging_table}`")
+            except Exception as e:
+                print(f"[Warning] : Could not drop staging tables `{suffix}` due to `{e}`")
@@ -0,0 +1,184 @@
+import pymysql
+import polars as pl
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from bulk_upload.config import (
+    EMPLOYEES_PERSONAL_DETAILS,
+    DEPENDENT_TABLES
+)
+from bulk_upload.db import (
+    get_pool,
+    insert_many_into_db,
+    fetch_primary_key
+)
+
+# Audit columns never make a row changed and are not overwritten by a sync
+SYNC_IGNORED_COLUMNS = ('created_by', 'modified_by')
+
+# Employee key the current rows are fetched and joined on
+SYNC_KEY = '_sync_emp_uuid'
+
+
+def _comparable(value) -> str | None:
+    """Text form of a payload or DB value, equal for equal data whatever type the driver returns."""
+
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float, Decimal)):
+        return format(Decimal(str(value)).normalize(), 'f')
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def _fetch_current(emp_uuids: list, primary_keys: dict, db_cred: tuple) -> dict:
+    """Current rows of the three tables for `emp_uuids`, one query per table.
+    Returns {table: {emp_uuid: row}}, the newest dependent row wins."""
+
+    placeholders = ", ".join(["%s"] * len(emp_uuids))
+    current = {}
+
+    with get_pool(*db_cred).connection() as conn:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT *, `emp_uuid` AS `{SYNC_KEY}`
+                FROM `{EMPLOYEES_PERSONAL_DETAILS}`
+                WHERE `emp_uuid` IN ({placeholders})
+            """, emp_uuids)
+            current[EMPLOYEES_PERSONAL_DETAILS] = {str(row[SYNC_KEY]): row for row in cursor.fetchall()}
+
+            for table in DEPENDENT_TABLES:
+                cursor.execute(f"""
+                    SELECT d.*, e.`emp_uuid` AS `{SYNC_KEY}`
+                    FROM `{table}` d
+                    JOIN `{EMPLOYEES_PERSONAL_DETAILS}` e
+                      ON e.`emp_id` = d.`fk_emp_id`
+                    WHERE e.`emp_uuid` IN ({placeholders})
+                    ORDER BY d.`{primary_keys[table]}`
+                """, emp_uuids)
+                current[table] = {str(row[SYNC_KEY]): row for row in cursor.fetchall()}
+
+    return current
+
+
+def diff_table(emp_uuids: list, payloads: list, current_rows: dict) -> list:
+    """Which payloads differ from the current DB rows of one table, joined on emp_uuid.
+
+    A payload is changed when its row is missing from DB or any column it
+    carries holds another value there. Columns a payload leaves out keep
+    their DB value, as `exclude_none=True` dumps never clear a column.
+    Returns one bool per payload.
+    """
+
+    columns = list(dict.fromkeys(
+        column
+        for payload in payloads
+        for column in payload
+        if column not in SYNC_IGNORED_COLUMNS
+    ))
+    schema = {SYNC_KEY: pl.Utf8, **{column: pl.Utf8 for column in columns}}
+
+    df_new = pl.DataFrame(
+        {
+            SYNC_KEY: emp_uuids,
+            **{column: [_comparable(payload.get(column)) for payload in payloads] for column in columns}
+        },
+        schema=schema
+    )
+    df_db = pl.DataFrame(
+        {
+            SYNC_KEY: list(current_rows),
+            **{column: [_comparable(row.get(column)) for row in current_rows.values()] for column in columns}
+        },
+        schema=schema
+    ).with_columns(pl.lit(True).alias('_in_db'))
+
+    changed = df_new.join(df_db, on=SYNC_KEY, how='left', suffix='_db', maintain_order='left').select(
+        pl.col('_in_db').is_null() | pl.any_horizontal(
+            pl.lit(False),
+            *[
+                pl.col(column).is_not_null() & pl.col(column).ne_missing(pl.col(f'{column}_db'))
+                for column in columns
+            ]
+        )
+    )
+    return changed.to_series().to_list()
+
+
+def sync_employees(
+    payloads: list,
+    emp_ids: list,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+) -> list:
+    """Diff employees already in DB ({table: payload} each, `emp_ids` their ids) against their
+    current rows and write only the changed ones, one bulk upsert per table in one transaction.
+    Returns one bool per payload (anything written), raises RuntimeError when the write fails."""
+
+    db_cred = (host, user, password, database, port)
+    tables = (EMPLOYEES_PERSONAL_DETAILS, *DEPENDENT_TABLES)
+
+    emp_uuids = [str(payload[EMPLOYEES_PERSONAL_DETAILS]['emp_uuid']) for payload in payloads]
+    primary_keys = {table: fetch_primary_key(table, *db_cred) for table in tables}
+    current = _fetch_current(emp_uuids, primary_keys, db_cred)
+
+    changed = {
+        table: diff_table(emp_uuids, [payload[table] for payload in payloads], current[table])
+        for table in tables
+    }
+
+    upserts = {}
+    for table in tables:
+        pk = primary_keys[table]
+        rows = []
+        for payload, emp_uuid, emp_id, is_changed in zip(payloads, emp_uuids, emp_ids, changed[table]):
+            if not is_changed:
+                continue
+            row = dict(payload[table])
+            if table == EMPLOYEES_PERSONAL_DETAILS:
+                row[pk] = emp_id
+            else:
+                row['fk_emp_id'] = emp_id
+                if emp_uuid in current[table]:
+                    row[pk] = current[table][emp_uuid][pk]
+            rows.append(row)
+        if rows:
+            upserts[table] = rows
+
+    if upserts:
+        with get_pool(*db_cred).connection() as conn:
+            try:
+                for table, rows in upserts.items():
+                    update_columns = list(dict.fromkeys(
+                        column
+                        for row in rows
+                        for column in row
+                        if column != primary_keys[table] and column not in SYNC_IGNORED_COLUMNS
+                    ))
+                    insert_many_into_db(
+                        rows,
+                        table,
+                        *db_cred,
+                        chunk_size=len(rows),
+                        conn=conn,
+                        update_columns=update_columns
+                    )
+                conn.commit()
+
+            except Exception as e:
+                conn.rollback()
+                raise RuntimeError(f"Sync write failed: {e}")
+
+    return [any(changed[table][i] for table in tables) for i in range(len(payloads))]
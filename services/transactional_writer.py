@@ -0,0 +1,146 @@
+from bulk_upload.config import (
+    EMPLOYEES_PERSONAL_DETAILS,
+    DEPENDENT_TABLES
+)
+from bulk_upload.db import (
+    get_pool,
+    insert_many_into_db,
+    insert_job_checkpoints
+)
+
+
+def write_employees_transactional(
+    payloads: list,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    checkpoint: tuple | None = None,
+) -> list:
+    """Write employees ({table: payload} each) in one transaction, one savepoint per employee,
+    so a failing employee is rolled back alone. `checkpoint` = (job_id, row indices) is recorded with them.
+    Returns one (emp_id, None) or (None, error) per payload, raises RuntimeError when the commit fails."""
+
+    db_cred = (host, user, password, database, port)
+    results = []
+
+    with get_pool(*db_cred).connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                for payload in payloads:
+                    cursor.execute("SAVEPOINT employee_row")
+                    table = EMPLOYEES_PERSONAL_DETAILS
+                    try:
+                        emp_id = insert_many_into_db(
+                            [payload[table]],
+                            table,
+                            *db_cred,
+                            conn=conn
+                        )[0]
+
+                        for table in DEPENDENT_TABLES:
+                            insert_many_into_db(
+                                [{**payload[table], 'fk_emp_id': emp_id}],
+                                table,
+                                *db_cred,
+                                conn=conn
+                            )
+
+                        cursor.execute("RELEASE SAVEPOINT employee_row")
+                        results.append((emp_id, None))
+
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT employee_row")
+                        results.append((None, f'[DBInsertionError] : Insertion into `{table}` failed : {e} '))
+
+            if checkpoint is not None:
+                job_id, row_indices = checkpoint
+                done = [(row_index, emp_id) for row_index, (emp_id, _) in zip(row_indices, results) if emp_id is not None]
+                insert_job_checkpoints(
+                    job_id,
+                    [row_index for row_index, _ in done],
+                    [emp_id for _, emp_id in done],
+                    *db_cred,
+                    conn=conn
+                )
+
+            conn.commit()
+            return results
+
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Chunk transaction failed: {e}")
+
+
+def write_employees_bulk(
+    payloads: list,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    port: int = 3306,
+    checkpoint: tuple | None = None,
+) -> dict:
+    """Write employees in three round trips: one multi-VALUES INSERT, one SELECT of the new ids
+    by emp_uuid, one INSERT per dependent table. One transaction, so a bad row fails them all.
+    Returns emp_uuid -> new emp_id, raises RuntimeError with nothing committed on any failure."""
+
+    emp_uuids = [str(payload[EMPLOYEES_PERSONAL_DETAILS]['emp_uuid']) for payload in payloads]
+    if len(set(emp_uuids)) != len(emp_uuids):
+        raise RuntimeError("Chunk contains duplicate emp_uuid values")
+
+    db_cred = (host, user, password, database, port)
+
+    with get_pool(*db_cred).connection() as conn:
+        try:
+            # chunk_size covers the whole chunk: one statement per table
+            ids = insert_many_into_db(
+                [payload[EMPLOYEES_PERSONAL_DETAILS] for payload in payloads],
+                EMPLOYEES_PERSONAL_DETAILS,
+                *db_cred,
+                chunk_size=len(payloads),
+                conn=conn
+            )
+
+            # ids from this insert start at the first generated id, older rows sharing an emp_uuid stay out
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT `emp_uuid`, `emp_id`
+                    FROM `{EMPLOYEES_PERSONAL_DETAILS}`
+                    WHERE `emp_uuid` IN ({", ".join(["%s"] * len(emp_uuids))})
+                      AND `emp_id` >= %s
+                """, (*emp_uuids, min(ids)))
+                new_ids = {str(emp_uuid): emp_id for emp_uuid, emp_id in cursor.fetchall()}
+
+            if len(new_ids) != len(payloads):
+                raise RuntimeError(f"{len(new_ids)} of {len(payloads)} new `{EMPLOYEES_PERSONAL_DETAILS}` ids resolved")
+
+            for table in DEPENDENT_TABLES:
+                insert_many_into_db(
+                    [
+                        {**payload[table], 'fk_emp_id': new_ids[emp_uuid]}
+                        for payload, emp_uuid in zip(payloads, emp_uuids)
+                    ],
+                    table,
+                    *db_cred,
+                    chunk_size=len(payloads),
+                    conn=conn
+                )
+
+            if checkpoint is not None:
+                job_id, row_indices = checkpoint
+                insert_job_checkpoints(
+                    job_id,
+                    row_indices,
+                    [new_ids[emp_uuid] for emp_uuid in emp_uuids],
+                    *db_cred,
+                    conn=conn
+                )
+
+            conn.commit()
+            return new_ids
+
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Bulk chunk insert failed: {e}")
@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+from pydantic import (
+    BaseModel,
+    TypeAdapter,
+    ValidationError
+)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """`list[model]` adapter, built once per model: schema building is the expensive part."""
+    return TypeAdapter(list[model])
+
+
+def validate_batch(model: type[BaseModel], payloads: list) -> tuple[dict, dict]:
+    """Validate a chunk of payload dicts against `model` in one call.
+
+    The models in `models.py` stay the source of truth. Valid payloads are
+    dumped with `exclude_none=True`, exactly as `model(**payload).model_dump(exclude_none=True)`
+    would, so omitted columns keep their DB defaults in `insert_many_into_db`.
+    Failing payloads are validated once more on their own, so their messages
+    match the row-by-row ones.
+
+    Returns ({index: dumped payload}, {index: ValidationError}), indices into `payloads`.
+    """
+
+    if not payloads:
+        return {}, {}
+
+    adapter = _list_adapter(model)
+    indices = list(range(len(payloads)))
+    errors = {}
+
+    try:
+        models = adapter.validate_python(payloads)
+    except ValidationError as e:
+        # locations start with the list index of the failing payload
+        failed = sorted({error['loc'][0] for error in e.errors() if error['loc']})
+        for i in failed:
+            try:
+                model(**payloads[i])
+            except ValidationError as row_error:
+                errors[i] = row_error
+
+        indices = [i for i in indices if i not in errors]
+        models = adapter.validate_python([payloads[i] for i in indices]) if indices else []
+
+    dumped = adapter.dump_python(models, exclude_none=True)
+    return dict(zip(indices, dumped)), errors
@@ -0,0 +1,5 @@
+import os
+
+# config.py reads these at import time, the tests never connect to DB
+os.environ.setdefault("DB_PORT", "3306")
+os.environ.setdefault("BATCH_UPDATE_SIZE", "100")
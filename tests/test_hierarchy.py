@@ -0,0 +1,39 @@
+import polars as pl
+
+from bulk_upload.services.hierarchy import hierarchy_waves
+
+
+def _upload(emp_ids, heads):
+    return pl.DataFrame({
+        'emp_id': [str(emp_id) for emp_id in emp_ids],
+        'national_head_emp_id': heads,
+        'country_head_emp_id': heads,
+    })
+
+
+def test_numeric_head_ids_match_text_emp_ids():
+    # emp_id is text after cleaning, numeric head columns stay Int64
+    df = _upload([201, 202], pl.Series([200, 201], dtype=pl.Int64))
+
+    waves, df_cyclic = hierarchy_waves(df)
+
+    assert [wave['emp_id'].to_list() for wave in waves] == [['201'], ['202']]
+    assert df_cyclic.is_empty()
+
+
+def test_text_head_ids_are_stripped():
+    df = _upload([201, 202], [' 200', '201 '])
+
+    waves, _ = hierarchy_waves(df)
+
+    assert [wave['emp_id'].to_list() for wave in waves] == [['201'], ['202']]
+
+
+def test_head_cycle_is_reported():
+    df = _upload([201, 202], pl.Series([202, 201], dtype=pl.Int64))
+
+    waves, df_cyclic = hierarchy_waves(df)
+
+    assert waves == []
+    assert df_cyclic['emp_id'].to_list() == ['201', '202']
+    assert df_cyclic['Error'].str.starts_with('[HierarchyCycleError]').all()
@@ -0,0 +1,123 @@
+from datetime import date, datetime
+
+import polars as pl
+import pytest
+
+from bulk_upload.config import clean_str, clean_upper, clean_age
+from bulk_upload.services.preprocess import (
+    SYNC_UPDATE_COLUMN,
+    _clean_expr,
+    clean_and_validate,
+    flag_duplicates
+)
+
+
+def _polars(transform, values, dtype):
+    df = pl.DataFrame({'v': values}, schema={'v': dtype})
+    return df.select(_clean_expr('v', transform, dtype))['v'].to_list()
+
+
+def _python(transform, value):
+    # the row-by-row cleaning `clean_and_validate` replaced
+    try:
+        return transform(value)
+    except Exception:
+        return None
+
+
+# ---- FIELD_MAP transforms ----
+
+@pytest.mark.parametrize("transform, dtype, values", [
+    (clean_str, pl.Utf8, ['  Asha ', 'Ravi', None]),
+    (clean_str, pl.Int64, [200, None]),
+    (clean_upper, pl.Utf8, [' a1 ', 'B2', None]),
+    (clean_age, pl.Int64, [31, None]),
+    (clean_age, pl.Float64, [31.0, 31.7, float('nan'), float('inf'), None]),
+    (clean_age, pl.Utf8, [' 31 ', None]),
+    (float, pl.Utf8, ['12.5', ' 12.5 ', 'abc', '1,000', None]),
+    (float, pl.Int64, [5, None]),
+    (float, pl.Float64, [2.5, None]),
+    (str, pl.Utf8, [' E1 ', 'E2']),
+    (str, pl.Int64, [9876543210]),
+    (str, pl.Float64, [9876543210.0]),
+    (str, pl.Datetime, [datetime(2024, 1, 5), datetime(2024, 1, 5, 13, 45, 7)]),
+    (str, pl.Date, [date(2024, 1, 5)]),
+])
+def test_clean_expr_matches_python_transform(transform, dtype, values):
+    assert _polars(transform, values, dtype) == [_python(transform, value) for value in values]
+
+
+@pytest.mark.parametrize("dtype", [pl.Utf8, pl.Int64, pl.Datetime])
+def test_str_keeps_nulls(dtype):
+    # str(None) gives 'None', which no lookup matches and mandatory fields fail on before,
+    # so a null stays null instead
+    assert _polars(str, [None], dtype) == [None]
+
+
+def test_missing_mandatory_fields_are_listed():
+    df = clean_and_validate(pl.DataFrame({'email': [None, 'a@example.com']}))
+
+    missing_email, has_email = df['FieldNotFoundError'].to_list()
+    assert '`email`' in missing_email
+    assert '`mobile_no`' in missing_email
+    assert '`email`' not in has_email
+
+
+# ---- Duplicate detection ----
+
+def _upload(emp_ids, emails, mobiles, sync_update=None):
+    df = pl.DataFrame({'emp_id': emp_ids, 'email': emails, 'mobile_no': mobiles})
+    if sync_update is not None:
+        df = df.with_columns(pl.Series(SYNC_UPDATE_COLUMN, sync_update, dtype=pl.Boolean))
+    return df
+
+
+def test_in_file_emails_compare_case_insensitively():
+    df = flag_duplicates(_upload(['E1', 'E2'], ['Asha@Example.com', ' asha@example.COM'], ['1', '2']), {})
+
+    assert df['duplicateInFileError'].str.contains('`email`').to_list() == [True, True]
+    assert df['duplicateInDBError'].is_null().all()
+
+
+def test_every_in_file_copy_is_flagged():
+    df = flag_duplicates(_upload(['E1', 'E2', 'E3', 'E4'], ['a@x.com', 'b@x.com', 'c@x.com', 'd@x.com'], ['9', '9', '9', '8']), {})
+
+    errors = df['duplicateInFileError'].to_list()
+    assert all('appears 3 times' in error for error in errors[:3])
+    assert errors[3] is None
+
+
+def test_values_already_in_db_are_flagged():
+    existing = {'emp_id': ['E1'], 'email': ['Taken@x.com'], 'mobile_no': []}
+    df = flag_duplicates(_upload(['E1', 'E2', 'E3'], ['a@x.com', 'taken@x.com', 'c@x.com'], ['1', '2', '3']), existing)
+
+    errors = df['duplicateInDBError'].to_list()
+    assert '`emp_id`' in errors[0]
+    assert '`email`' in errors[1]
+    assert errors[2] is None
+
+
+def test_sync_row_keeps_its_own_email_but_not_another_employees():
+    owners = {
+        'email': {'Own@x.com': 'E1', 'other@x.com': 'E9'},
+        'mobile_no': {},
+    }
+    df = flag_duplicates(
+        _upload(['E1', 'E2'], ['own@x.com', 'other@x.com'], ['1', '2'], sync_update=[True, True]),
+        {'emp_id': ['E1', 'E2']},
+        owners
+    )
+
+    own, taken = df['duplicateInDBError'].to_list()
+    assert own is None
+    assert '`email`' in taken
+
+
+def test_insert_row_ignores_owners():
+    df = flag_duplicates(
+        _upload(['E1', 'E5'], ['own@x.com', 'new@x.com'], ['1', '2'], sync_update=[True, False]),
+        {'emp_id': [], 'email': ['own@x.com']},
+        {'email': {'own@x.com': 'E1'}}
+    )
+
+    assert df['duplicateInDBError'].to_list() == [None, None]